@@ -1,8 +1,13 @@
 import os
+import time
+import heapq
 import asyncio
 import logging
 import pynautobot
-from typing import Dict, Any, List
+from collections import deque
+from typing import Dict, Any, List, Deque, Optional, Set, Tuple
+from nautobot_inventory_cache import InventoryCache
+from nautobot_topology import TopologyGraph
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -11,6 +16,8 @@ logger = logging.getLogger("nautobot-graphql")
 # Load config from environment
 NAUTOBOT_URL = os.getenv("NAUTOBOT_URL", "https://demo.nautobot.com")
 NAUTOBOT_TOKEN = os.getenv("NAUTOBOT_TOKEN", "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
+INVENTORY_CACHE = os.getenv("INVENTORY_CACHE")  # Path to a SQLite cache; unset to always fetch live
+QUERY_TIMEOUT = float(os.getenv("GRAPHQL_QUERY_TIMEOUT", "60"))  # Seconds before a batch query counts as failed
 
 # Initialize pynautobot
 nautobot = pynautobot.api(
@@ -54,37 +61,215 @@ async def run_graphql_query(device_names: List[str]) -> Dict[str, Any]:
         return nautobot.graphql.query(
             query=GRAPHQL_QUERY,
             variables={"device_names": device_names},
-            timeout=15
         ).json
 
     return await asyncio.to_thread(_query)
 
-async def fetch_devices_in_batches(all_devices: List[str], batch_size: int = 50) -> List[Dict[str, Any]]:
-    """Fetch devices in parallel batches using GraphQL."""
-    tasks = []
-    for i in range(0, len(all_devices), batch_size):
-        batch = all_devices[i:i+batch_size]
-        tasks.append(run_graphql_query(batch))
-
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-
-    # Flatten & collect device data
-    devices = []
-    for res in results:
-        if isinstance(res, Exception):
-            logger.error(f"GraphQL batch failed: {res}")
+class AdaptiveBatchScheduler:
+    """
+    AIMD scheduler for GraphQL batch queries.
+
+    Keeps at most `concurrency` queries in flight and sizes each new batch
+    from `batch_size`. Both grow additively while queries come back faster
+    than `target_latency`, the batch size is cut when queries are slow and
+    both are halved when a query fails or takes longer than `query_timeout`.
+    Failed batches are split in two and re-queued after an exponential
+    delay (`retry_delay` doubling per consecutive failure, up to
+    `max_retry_delay`); a single device is only dropped after `max_attempts`.
+    The run is abandoned with RuntimeError after `max_consecutive_failures`
+    failed queries with no success in between.
+
+    A timed-out query's worker thread can't be stopped, so it keeps its
+    concurrency slot until it really returns; its result is discarded.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 50,
+        min_batch_size: int = 5,
+        max_batch_size: int = 200,
+        batch_step: int = 10,
+        concurrency: int = 4,
+        max_concurrency: int = 16,
+        target_latency: float = 5.0,
+        max_attempts: int = 3,
+        query_timeout: float = QUERY_TIMEOUT,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        max_consecutive_failures: int = 10,
+    ):
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_step = batch_step
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.max_attempts = max_attempts
+        self.query_timeout = query_timeout
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_consecutive_failures = max_consecutive_failures
+
+        self.queries = 0
+        self.errors = 0
+        self.failed_devices: List[str] = []
+        # Only one decrease per congestion event: results from queries started
+        # before the last decrease reflect the old limits and are ignored
+        self._last_decrease = 0.0
+        self._consecutive_failures = 0
+        self._retry_seq = 0  # Tie-breaker so the retry heap never compares batches
+
+    def _increase(self) -> None:
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        self.batch_size = min(self.max_batch_size, self.batch_size + self.batch_step)
+
+    def _decrease(self, started: float, concurrency: bool) -> None:
+        if started < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        if concurrency:
+            self.concurrency = max(1, self.concurrency // 2)
+        logger.info(f"Backing off: concurrency={self.concurrency} batch_size={self.batch_size}")
+
+    def _next_batch(self, pending: Deque[str], retries: List[Tuple[float, int, List[str], int]]) -> Optional[Tuple[List[str], int]]:
+        # Retried halves go first once their delay is up, so failures are resolved before new work starts
+        if retries and retries[0][0] <= time.monotonic():
+            _, _, batch, attempt = heapq.heappop(retries)
+            return batch, attempt
+        if not pending:
+            return None
+        size = min(self.batch_size, len(pending))
+        return [pending.popleft() for _ in range(size)], 1
+
+    def _requeue(self, batch: List[str], attempt: int, retries: List[Tuple[float, int, List[str], int]]) -> None:
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** (self._consecutive_failures - 1))
+        ready = time.monotonic() + delay
+        if len(batch) > 1:
+            middle = len(batch) // 2
+            parts = [(batch[:middle], attempt), (batch[middle:], attempt)]
+        elif attempt < self.max_attempts:
+            parts = [(batch, attempt + 1)]
         else:
-            devices.extend(res.get("data", {}).get("devices", []))
-    return devices
+            logger.error(f"Giving up on {batch[0]} after {attempt} attempts")
+            self.failed_devices.extend(batch)
+            return
+        for part, part_attempt in parts:
+            self._retry_seq += 1
+            heapq.heappush(retries, (ready, self._retry_seq, part, part_attempt))
+
+    async def run(self, all_devices: List[str]) -> List[Dict[str, Any]]:
+        """Fetch every device, adapting concurrency and batch size as results arrive."""
+        pending: Deque[str] = deque(all_devices)
+        retries: List[Tuple[float, int, List[str], int]] = []  # Heap of (ready at, seq, batch, attempt)
+        in_flight: Dict[asyncio.Task, Tuple[List[str], int, float]] = {}
+        abandoned: Set[asyncio.Task] = set()  # Timed out, but the worker thread is still running
+        devices: List[Dict[str, Any]] = []
+
+        while pending or retries or in_flight:
+            while len(in_flight) + len(abandoned) < self.concurrency:
+                next_batch = self._next_batch(pending, retries)
+                if next_batch is None:
+                    break
+                batch, attempt = next_batch
+                task = asyncio.create_task(run_graphql_query(batch))
+                in_flight[task] = (batch, attempt, time.monotonic())
+
+            # Wake for the first result, the first query deadline or the first retry coming due
+            wakeups = [started + self.query_timeout for _, _, started in in_flight.values()]
+            if retries and len(in_flight) + len(abandoned) < self.concurrency:
+                wakeups.append(retries[0][0])
+            timeout = max(0.0, min(wakeups) - time.monotonic()) if wakeups else None
+            waiting = set(in_flight) | abandoned
+            if waiting:
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            else:
+                done = set()
+                await asyncio.sleep(timeout or 0)
+
+            abandoned -= done
+
+            now = time.monotonic()
+            for task in list(in_flight):
+                batch, attempt, started = in_flight[task]
+                if task in done:
+                    exc = task.exception()
+                    if exc is None and task.result().get("errors"):
+                        exc = RuntimeError(task.result()["errors"])
+                elif now - started >= self.query_timeout:
+                    abandoned.add(task)
+                    # Retrieve a late failure so it isn't reported as unhandled
+                    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                    exc = RuntimeError(f"timed out after {self.query_timeout}s")
+                else:
+                    continue
+                del in_flight[task]
+                self.queries += 1
+
+                if exc is not None:
+                    self.errors += 1
+                    self._consecutive_failures += 1
+                    logger.warning(f"GraphQL batch of {len(batch)} failed (attempt {attempt}): {exc}")
+                    if self._consecutive_failures >= self.max_consecutive_failures:
+                        for other in in_flight:
+                            other.cancel()
+                        raise RuntimeError(
+                            f"Giving up: {self._consecutive_failures} GraphQL queries failed in a row "
+                            f"with no success (last error: {exc})"
+                        )
+                    self._decrease(started, concurrency=True)
+                    self._requeue(batch, attempt, retries)
+                    continue
+
+                self._consecutive_failures = 0
+                devices.extend((task.result().get("data") or {}).get("devices") or [])
+                if now - started > self.target_latency:
+                    self._decrease(started, concurrency=False)
+                else:
+                    self._increase()
+
+        logger.info(
+            f"Fetched {len(devices)} devices in {self.queries} queries "
+            f"({self.errors} errors, {len(self.failed_devices)} devices failed); "
+            f"final concurrency={self.concurrency} batch_size={self.batch_size}"
+        )
+        return devices
+
+async def fetch_devices_in_batches(all_devices: List[str], batch_size: int = 50) -> List[Dict[str, Any]]:
+    """Fetch devices in adaptively sized and bounded parallel batches using GraphQL."""
+    scheduler = AdaptiveBatchScheduler(batch_size=batch_size)
+    return await scheduler.run(all_devices)
+
+async def load_from_cache(path: str) -> List[Dict[str, Any]]:
+    """Incrementally sync the local inventory cache and read devices from it."""
+    def _sync_and_load():
+        cache = InventoryCache(path)
+        try:
+            cache.sync(nautobot, status="active")
+            return cache.load_devices()
+        finally:
+            cache.close()
+
+    return await asyncio.to_thread(_sync_and_load)
 
 async def main():
-    # Pull all active devices from Nautobot inventory
-    all_devices = [dev.name for dev in nautobot.dcim.devices.filter(status="active")]
+    if INVENTORY_CACHE:
+        devices = await load_from_cache(INVENTORY_CACHE)
+        logger.info(f"Loaded {len(devices)} active devices from {INVENTORY_CACHE}")
+    else:
+        # Pull all active devices from Nautobot inventory
+        all_devices = [dev.name for dev in nautobot.dcim.devices.filter(status="active")]
+
+        logger.info(f"Found {len(all_devices)} active devices in Nautobot")
 
-    logger.info(f"Found {len(all_devices)} active devices in Nautobot")
+        # Fetch metadata via GraphQL
+        devices = await fetch_devices_in_batches(all_devices, batch_size=50)
 
-    # Fetch metadata via GraphQL
-    devices = await fetch_devices_in_batches(all_devices, batch_size=50)
+    # Build the link graph from connected_endpoint data
+    topology = TopologyGraph()
+    topology.update(devices)
+    logger.info(f"Topology: {topology.stats()}")
 
     for dev in devices:
         logger.info(f"✅ {dev['name']} | IP: {dev.get('primary_ip4', {}).get('address')} | Platform: {dev['platform']['name']}")
@@ -0,0 +1,207 @@
+"""Asyncio SSH collection backend: many CLI sessions on one event loop instead of one thread each."""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from nautobot_fingerprints import FingerprintStore, fingerprint, fingerprint_commands, fingerprint_marker, interfaces_last_updated
+from nautobot_interface_parsers import get_parser
+
+logger = logging.getLogger(__name__)
+
+# Value for the jobs' "backend" ChoiceVar
+BACKEND_CHOICES = (
+    ("threads", "Threads (Nornir/Netmiko or NAPALM)"),
+    ("asyncio", "Asyncio SSH (scrapli)"),
+)
+
+# Parser platform slug -> scrapli platform definition (prompts, paging, privilege levels)
+SCRAPLI_DEFINITIONS = {
+    "ios": "cisco_iosxe",
+    "nxos": "cisco_nxos",
+    "junos": "juniper_junos",
+}
+
+
+class CollectTarget:
+    """
+    One device to collect from: where to connect, its platform slug and which commands to run.
+
+    `checks` run first on the same session. If `skip` is given, it is called
+    with the list of their outputs and `commands` are skipped when it
+    returns True (e.g. an unchanged fingerprint). Results hold the outputs
+    of `checks`, then of `commands`.
+    """
+
+    __slots__ = ("name", "hostname", "platform", "commands", "checks", "skip")
+
+    def __init__(self, name: str, hostname: str, platform: str, commands: Sequence[str],
+                 checks: Sequence[str] = (), skip: Optional[Callable[[List[str]], bool]] = None):
+        self.name = name
+        self.hostname = hostname
+        self.platform = platform
+        self.commands = list(commands)
+        self.checks = list(checks)
+        self.skip = skip
+
+
+async def _collect_host(scrapli, target: CollectTarget, username: str, password: str, port: int,
+                        timeout: float, sessions: asyncio.Semaphore, host_slots: Dict[str, asyncio.Semaphore]) -> List[str]:
+    # Global cap first, then the per-host cap; the timeout starts once both are held
+    async with sessions, host_slots[target.hostname]:
+        async def send(cli, command: str) -> str:
+            result = await cli.send_input_async(command)
+            if result.failed:
+                raise RuntimeError(f"{command!r} failed: {result.result.strip()}")
+            return result.result
+
+        async def session() -> List[str]:
+            cli = scrapli.Cli(
+                target.hostname,
+                port=port,
+                definition_file_or_name=SCRAPLI_DEFINITIONS[target.platform],
+                auth_options=scrapli.AuthOptions(username=username, password=password),
+                session_options=scrapli.SessionOptions(operation_timeout_ns=int(timeout * 1e9)),
+                # libssh2 inside libscrapli: no ssh process per session, no host key checks
+                transport_options=scrapli.TransportSsh2Options(),
+            )
+            # The definition's on-open steps disable paging; commands then run at the prompt in turn
+            async with cli:
+                outputs = [await send(cli, command) for command in target.checks]
+                if target.skip and target.skip(outputs):
+                    return outputs
+                for command in target.commands:
+                    outputs.append(await send(cli, command))
+                return outputs
+
+        # Cancelling on timeout also cancels the scrapli operation in flight
+        return await asyncio.wait_for(session(), timeout)
+
+
+async def collect_async(
+    targets: Sequence[CollectTarget],
+    username: str,
+    password: str,
+    port: int = 22,
+    max_sessions: int = 500,
+    per_host: int = 1,
+    timeout: float = 60,
+    retries: int = 3,
+    delay: float = 5,
+) -> Tuple[Dict[str, List[str]], Dict[str, BaseException]]:
+    """
+    Run every target's commands concurrently and retry only the targets that failed.
+
+    Sessions use scrapli's asyncio API (`open_async` / `send_input_async`),
+    so each one is a coroutine on this loop rather than a thread. At most
+    `max_sessions` SSH sessions are open at once, and at most `per_host`
+    per management address. Each target must finish within `timeout`
+    seconds of getting its session slot. Returns (name -> command outputs,
+    name -> last error).
+    """
+    try:
+        import scrapli
+    except ImportError:
+        raise RuntimeError("The asyncio backend needs the scrapli package (pip install -r requirements-optional.txt)")
+
+    sessions = asyncio.Semaphore(max_sessions)
+    host_slots: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_host))
+    outputs: Dict[str, List[str]] = {}
+    errors: Dict[str, BaseException] = {}
+
+    pending = []
+    for target in targets:
+        if target.platform in SCRAPLI_DEFINITIONS:
+            pending.append(target)
+        else:
+            errors[target.name] = ValueError(f"no scrapli definition for platform {target.platform}")
+
+    for attempt in range(1, retries + 1):
+        results = await asyncio.gather(
+            *[_collect_host(scrapli, target, username, password, port, timeout, sessions, host_slots) for target in pending],
+            return_exceptions=True,
+        )
+        failed = []
+        for target, result in zip(pending, results):
+            if isinstance(result, asyncio.TimeoutError):
+                errors[target.name] = asyncio.TimeoutError(f"timed out after {timeout} seconds")
+                failed.append(target)
+            elif isinstance(result, BaseException):
+                errors[target.name] = result
+                failed.append(target)
+            else:
+                outputs[target.name] = result
+                errors.pop(target.name, None)
+
+        if not failed or attempt == retries:
+            break
+        logger.warning(f"Attempt {attempt} failed for {len(failed)} hosts: {', '.join(sorted(t.name for t in failed))}. Retrying.")
+        pending = failed
+        await asyncio.sleep(delay)
+
+    return outputs, errors
+
+
+def collect(targets: Sequence[CollectTarget], username: str, password: str, **options) -> Tuple[Dict[str, List[str]], Dict[str, BaseException]]:
+    """Synchronous entry point for jobs: run `collect_async` on a fresh event loop."""
+    return asyncio.run(collect_async(targets, username, password, **options))
+
+
+def collect_interface_outputs(
+    devices: Dict[str, Any],
+    platforms: Dict[str, str],
+    username: str,
+    password: str,
+    store: Optional[FingerprintStore] = None,
+    **options,
+) -> Tuple[Dict[str, str], Dict[str, BaseException], Dict[str, str], Set[str]]:
+    """
+    Collect interface command output for the description jobs on one event loop.
+
+    `devices` maps device name -> Device and `platforms` maps device name ->
+    platform slug registered in nautobot_interface_parsers. With a `store`,
+    devices whose platform has fingerprint commands run them first on the
+    same connection and skip the interface command when the fingerprint
+    matches the stored one; stored fingerprints and interface timestamps
+    are fetched up front so the check never touches the ORM from the loop.
+
+    Returns (name -> interface output, name -> error, name -> fingerprint
+    marker for devices with usable check output, names skipped as unchanged).
+    """
+    stored = store.stored(device.pk for device in devices.values()) if store else {}
+    updated = interfaces_last_updated(device.pk for device in devices.values()) if store else {}
+
+    targets = []
+    for name, device in devices.items():
+        platform = platforms[name]
+        command, _ = get_parser(platform)
+        hostname = str(device.primary_ip.address.ip)
+        device_id = str(device.pk)
+
+        def unchanged(outputs: List[str], device_id=device_id, platform=platform) -> bool:
+            # Empty or error output counts as changed: it would match itself on every run
+            marker = fingerprint_marker(platform, outputs)
+            return marker is not None and stored.get(device_id) == fingerprint(marker, updated.get(device_id))
+
+        checks = fingerprint_commands(platform) if store else []
+        targets.append(CollectTarget(name, hostname, platform, [command], checks, unchanged if checks else None))
+
+    results, errors = collect(targets, username, password, **options)
+
+    outputs: Dict[str, str] = {}
+    markers: Dict[str, str] = {}
+    skipped: Set[str] = set()
+    for target in targets:
+        result = results.get(target.name)
+        if result is None:
+            continue
+        if target.checks:
+            marker = fingerprint_marker(target.platform, result[:len(target.checks)])
+            if marker is not None:
+                markers[target.name] = marker
+            if len(result) == len(target.checks):
+                skipped.add(target.name)
+                continue
+        outputs[target.name] = result[-1]
+    return outputs, errors, markers, skipped
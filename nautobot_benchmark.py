@@ -0,0 +1,208 @@
+"""Benchmark the Nautobot fetch strategies in this repo against the local stub server."""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import resource
+import subprocess
+import urllib.request
+from typing import Callable, Dict, List
+
+TOKEN = "0123456789abcdef0123456789abcdef01234567"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# ── strategies (each runs in its own child process) ───────────
+
+def run_graphql(url: str, devices: int) -> int:
+    import graphql
+    all_devices = [dev.name for dev in graphql.nautobot.dcim.devices.filter(status="active")]
+    return len(asyncio.run(graphql.fetch_devices_in_batches(all_devices, batch_size=50)))
+
+
+def run_optimized_chunks(url: str, devices: int) -> int:
+    import nautobot_graphql_optimized
+    from nautobot_stub_server import device_name
+    names = [device_name(i) for i in range(devices)]
+    return len(asyncio.run(nautobot_graphql_optimized.fetch_all_devices(names)))
+
+
+def run_optimized_stream(url: str, devices: int) -> int:
+    import nautobot_graphql_optimized
+
+    async def consume():
+        count = 0
+        async for _ in nautobot_graphql_optimized.iter_devices():
+            count += 1
+        return count
+
+    return asyncio.run(consume())
+
+
+def _nornir(url: str, plugin: str, **options):
+    from nornir import InitNornir
+    return InitNornir(
+        runner={"plugin": "threaded", "options": {"num_workers": 10}},
+        inventory={
+            "plugin": plugin,
+            "options": {
+                "nautobot_url": url,
+                "nautobot_token": TOKEN,
+                "ssl_verify": False,
+                "filter_parameters": {"status": "active"},
+                **options,
+            },
+        },
+        logging={"enabled": False},
+    )
+
+
+def run_multi_devices(url: str, devices: int) -> int:
+    import pynautobot
+    import nautobot_graphql_multi_devices
+    nautobot = pynautobot.api(url=url, token=TOKEN, threading=False, verify=False)
+    nr = _nornir(url, "PrefetchNautobotInventory", page_size=1000, workers=8)
+    results = asyncio.run(nautobot_graphql_multi_devices.run_in_batches(nr, nautobot, 50, 5))
+    return sum(1 for result in results.values() if not result.failed)
+
+
+def _prefetched(module_name: str, **options) -> Callable[[str, int], int]:
+    def run(url: str, devices: int) -> int:
+        module = __import__(module_name)
+        nr = _nornir(url, "PrefetchNautobotInventory", graphql_query=module.GRAPHQL_QUERY, **options)
+        results = nr.run(task=module.fetch_device_details)
+        return sum(1 for result in results.values() if not result.failed)
+    return run
+
+
+STRATEGIES: Dict[str, Callable[[str, int], int]] = {
+    "graphql": run_graphql,
+    "optimized_chunks": run_optimized_chunks,
+    "optimized_stream": run_optimized_stream,
+    "multi_devices": run_multi_devices,
+    "graphql_devices": _prefetched("nautobot_graphql_devices"),
+    "nornir_graphql": _prefetched("nautobot_nornir_graphql"),
+    "simple_graphql": _prefetched("nautobot_simple_graphql"),
+    # Same script with the host list loaded as concurrent GraphQL pages, eagerly and lazily prefetched
+    "nornir_graphql_paged": _prefetched("nautobot_nornir_graphql", page_size=1000, workers=8),
+    "nornir_graphql_lazy": _prefetched("nautobot_nornir_graphql", page_size=1000, workers=8, lazy=True),
+}
+
+
+def run_child(strategy: str, url: str, devices: int) -> None:
+    """Entry point of the child process: run one strategy and print its measurements as JSON."""
+    logging.disable(logging.WARNING)
+    start = time.perf_counter()
+    fetched = STRATEGIES[strategy](url, devices)
+    wall = time.perf_counter() - start
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(json.dumps({"fetched": fetched, "wall_s": round(wall, 3), "peak_rss_mb": round(peak_rss_mb, 1)}))
+
+
+# ── harness ───────────────────────────────────────────────────
+
+def _http(url: str, method: str = "GET") -> dict:
+    request = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _start_stub(args, devices: int) -> subprocess.Popen:
+    server = subprocess.Popen([
+        sys.executable, os.path.join(BASE_DIR, "nautobot_stub_server.py"),
+        "--devices", str(devices),
+        "--interfaces", str(args.interfaces),
+        "--latency-ms", str(args.latency_ms),
+        "--per-device-ms", str(args.per_device_ms),
+        "--error-rate", str(args.error_rate),
+        "--port", str(args.port),
+    ], cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Pre-rendering large inventories takes a few seconds
+    for _ in range(600):
+        try:
+            _http(f"http://127.0.0.1:{args.port}/_stats")
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Stub server did not start")
+
+
+def benchmark(args) -> List[dict]:
+    url = f"http://127.0.0.1:{args.port}"
+    env = {**os.environ, "NAUTOBOT_URL": url, "NAUTOBOT_TOKEN": TOKEN, "PYTHONWARNINGS": "ignore"}
+    rows = []
+
+    for devices in args.sizes:
+        server = _start_stub(args, devices)
+        try:
+            for strategy in args.strategies:
+                _http(f"{url}/_reset", method="POST")
+                child = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run-strategy", strategy, "--devices", str(devices)],
+                    cwd=BASE_DIR, env=env, capture_output=True, text=True, timeout=args.timeout,
+                )
+                row = {"strategy": strategy, "devices": devices}
+                if child.returncode == 0:
+                    row.update(json.loads(child.stdout.strip().splitlines()[-1]))
+                else:
+                    row["error"] = (child.stderr.strip().splitlines() or ["failed"])[-1]
+                row.update(_http(f"{url}/_stats"))
+                rows.append(row)
+                print(_format_row(row), flush=True)
+        finally:
+            server.terminate()
+            server.wait()
+
+    return rows
+
+
+# Wide enough for the longest strategy name plus a gap before the numbers
+NAME_WIDTH = max(len(name) for name in STRATEGIES) + 2
+
+HEADER = f"{'strategy':<{NAME_WIDTH}}{'devices':>8}{'fetched':>9}{'wall s':>9}{'graphql':>9}{'rest':>7}{'errors':>8}{'rss MB':>9}{'p50 ms':>9}{'p99 ms':>9}"
+
+
+def _format_row(row: dict) -> str:
+    if "error" in row:
+        return f"{row['strategy']:<{NAME_WIDTH}}{row['devices']:>8}  FAILED: {row['error'][:80]}"
+    return (
+        f"{row['strategy']:<{NAME_WIDTH}}{row['devices']:>8}{row['fetched']:>9}{row['wall_s']:>9.2f}"
+        f"{row['graphql']:>9}{row['rest']:>7}{row['errors']:>8}{row['peak_rss_mb']:>9.1f}"
+        f"{row['p50_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES))
+    parser.add_argument("--interfaces", type=int, default=8, help="Interfaces per synthetic device")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--per-device-ms", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--timeout", type=int, default=1800, help="Per-strategy timeout in seconds")
+    parser.add_argument("--output", help="Write all results as JSON to this file")
+    parser.add_argument("--run-strategy", help=argparse.SUPPRESS)
+    parser.add_argument("--devices", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_strategy:
+        run_child(args.run_strategy, os.environ["NAUTOBOT_URL"], args.devices)
+        return
+
+    print(HEADER, flush=True)
+    rows = benchmark(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Per-device fingerprints that let the description jobs skip devices unchanged since their last run."""
+
+import re
+import hashlib
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from django.core.cache import cache
+from django.db.models import Max
+from nautobot.dcim.models import Interface
+
+# Platform slug or NAPALM driver -> cheap commands whose combined output changes
+# whenever the config does or the device reloads. The reload marker is the
+# absolute boot or reset time rather than uptime, which changes on every run;
+# a reload can restore a different startup config without a config-change line.
+FINGERPRINT_COMMANDS = {
+    "ios": (
+        "show running-config | include ^! (Last|No) configuration change",
+        "show version | include restarted at|returned to ROM",
+    ),
+    "nxos": (
+        "show running-config | include \"last done at\"",
+        "show version | include \"Last reset\"",
+    ),
+    "nxos_ssh": (
+        "show running-config | include \"last done at\"",
+        "show version | include \"Last reset\"",
+    ),
+    # No pipe: NAPALM's Junos cli() splits commands on "|" to emulate pipes
+    # itself, so a quoted alternation never reaches the device. The marker
+    # lines are picked out in Python instead (FINGERPRINT_LINES).
+    "junos": ("show system uptime",),
+}
+
+# Platform -> pattern for the lines of the output that make up the marker,
+# for commands that cannot filter on the device
+FINGERPRINT_LINES = {
+    "junos": re.compile(r"^.*\b(?:System booted|Last configured):.*$", re.M),
+}
+
+# A rejected command, e.g. "% Invalid input detected" or "error: syntax error"
+ERROR_OUTPUT = re.compile(r"^\s*(?:%|error:|syntax error|unknown command)", re.M | re.I)
+
+# Entries expire so every device is fully re-collected at least this often
+FINGERPRINT_TTL = 7 * 24 * 3600
+
+# Relative times ("(1w2d 03:04 ago)") change on every run without a config change
+RELATIVE_TIME = re.compile(r"\([^)]*\bago\)")
+
+
+def fingerprint_commands(platform: Optional[str]) -> List[str]:
+    """Commands that fingerprint a platform's config and boot; empty if the platform has none."""
+    return list(FINGERPRINT_COMMANDS.get(platform, ()))
+
+
+def fingerprint_marker(platform: Optional[str], outputs: Sequence[str]) -> Optional[str]:
+    """
+    The fingerprint commands' outputs as one marker, or None if they cannot be trusted.
+
+    An empty or error output would read the same on every run and skip the
+    device forever, so callers must treat None as changed: collect in full
+    and store no fingerprint.
+    """
+    lines = FINGERPRINT_LINES.get(platform)
+    kept = []
+    for output in outputs:
+        if not output or ERROR_OUTPUT.search(output):
+            return None
+        if lines is not None:
+            output = "\n".join(match.group(0) for match in lines.finditer(output))
+        if not output.strip():
+            return None
+        kept.append(output)
+    return "\n".join(kept)
+
+
+def fingerprint(output: str, interfaces_updated: Optional[str]) -> str:
+    """
+    Hash of the config-change and boot markers and of the last Nautobot interface update.
+
+    `output` is the marker from fingerprint_marker().
+    Including the Nautobot side means an edit made in Nautobot since the
+    last run also forces the device to be collected again.
+    """
+    marker = " ".join(RELATIVE_TIME.sub("", output).split())
+    return hashlib.sha256(f"{marker}\n{interfaces_updated}".encode()).hexdigest()
+
+
+def interfaces_last_updated(device_ids: Iterable) -> Dict[str, str]:
+    """Latest interface `last_updated` per device (by primary key), in one query."""
+    rows = (
+        Interface.objects.filter(device_id__in=list(device_ids))
+        .values("device_id")
+        .annotate(last_updated=Max("last_updated"))
+    )
+    return {str(row["device_id"]): row["last_updated"].isoformat() for row in rows if row["last_updated"]}
+
+
+class FingerprintStore:
+    """
+    Fingerprints from the last successful run, kept in Django's cache.
+
+    Nautobot's cache is Redis, so fingerprints are shared by every worker
+    that runs the job. Keys are namespaced by job so two jobs touching the
+    same device do not skip each other's work.
+    """
+
+    def __init__(self, namespace: str, ttl: int = FINGERPRINT_TTL):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, device_id) -> str:
+        return f"interface-fingerprint:{self.namespace}:{device_id}"
+
+    def unchanged(self, fingerprints: Dict[str, str]) -> Set[str]:
+        """Device IDs whose fingerprint matches the stored one."""
+        keys = {self._key(device_id): device_id for device_id in fingerprints}
+        stored = cache.get_many(list(keys))
+        return {keys[key] for key, value in stored.items() if value == fingerprints[keys[key]]}
+
+    def stored(self, device_ids: Iterable) -> Dict[str, str]:
+        """Stored fingerprint per device ID, in one cache round trip; devices without one are left out."""
+        keys = {self._key(device_id): str(device_id) for device_id in device_ids}
+        return {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+    def save(self, fingerprints: Dict[str, str]) -> None:
+        if fingerprints:
+            cache.set_many({self._key(device_id): value for device_id, value in fingerprints.items()}, self.ttl)
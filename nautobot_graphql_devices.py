@@ -4,8 +4,8 @@ import logging
 from typing import Dict, Any
 from nornir import InitNornir
 from nornir.core.task import Task, Result
-from nornir_nautobot.plugins.inventory.nautobot import NautobotInventory
-import pynautobot
+from nautobot_prefetch_inventory import PrefetchNautobotInventory
+from nautobot_topology import TopologyGraph
 
 # Configure logging with minimal output
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -13,8 +13,8 @@ logger = logging.getLogger(__name__)
 
 # GraphQL query for devices with specified fields
 GRAPHQL_QUERY = """
-query ($device_name: String!) {
-  devices(name: $device_name) {
+query ($device_names: [String!]) {
+  devices(name__in: $device_names) {
     name
     primary_ip4 {
       address
@@ -39,28 +39,16 @@ query ($device_name: String!) {
 }
 """
 
-async def fetch_device_details(task: Task, nautobot: pynautobot.api) -> Result:
-    """Nornir task to fetch device details using GraphQL."""
+def fetch_device_details(task: Task) -> Result:
+    """Nornir task returning the device details prefetched by the inventory."""
     device_name = task.host.name
-    try:
-        # Execute GraphQL query with timeout
-        gql_response = nautobot.graphql.query(
-            query=GRAPHQL_QUERY,
-            variables={"device_name": device_name},
-            timeout=10
-        )
-        
-        data = gql_response.json.get("data", {}).get("devices")
-        if data and isinstance(data, list) and data[0]:
-            logger.info(f"Fetched data for {device_name}")
-            return Result(host=task.host, result=data[0])
-        
-        logger.warning(f"No data for {device_name}")
-        return Result(host=task.host, failed=True)
-        
-    except Exception as e:
-        logger.error(f"Failed for {device_name}: {str(e)}")
-        return Result(host=task.host, failed=True, exception=e)
+    data = task.host.data.get("graphql")
+    if data:
+        logger.info(f"Loaded prefetched data for {device_name}")
+        return Result(host=task.host, result=data)
+
+    logger.warning(f"No data for {device_name}")
+    return Result(host=task.host, failed=True)
 
 async def main():
     """Main async function to run Nornir tasks."""
@@ -73,36 +61,34 @@ async def main():
             "password": os.getenv("NAUTOBOT_PASSWORD", ""),
             "ssl_verify": False,  # Set to True in production
             "workers": 10,  # Optimized for small to medium inventories
-            "timeout": 10  # API request timeout in seconds
+            "page_size": int(os.getenv("NAUTOBOT_PAGE_SIZE", "1000")),  # 0 walks the REST device list serially
+            "lazy": os.getenv("NAUTOBOT_LAZY_INVENTORY", "false").lower() == "true",
         }
 
-        # Initialize pynautobot
-        nautobot = pynautobot.api(
-            url=config["url"],
-            token=config["token"],
-            threading=False,
-            verify=config["ssl_verify"],
-            timeout=config["timeout"]
-        )
-
         # Initialize Nornir with NautobotInventory
         nr = InitNornir(
             runner={"plugin": "threaded", "options": {"num_workers": config["workers"]}},
             inventory={
-                "plugin": "NautobotInventory",
+                "plugin": "PrefetchNautobotInventory",
                 "options": {
                     "nautobot_url": config["url"],
                     "nautobot_token": config["token"],
                     "ssl_verify": config["ssl_verify"],
                     "filter_parameters": {"status": "active"},
+                    "graphql_query": GRAPHQL_QUERY,  # Prefetched for all hosts in bulk
+                    "page_size": config["page_size"],  # Host list loaded as concurrent GraphQL pages
+                    "workers": 8,
+                    "lazy": config["lazy"],
                 },
             },
-            credentials={"defaults": {"username": config["email"], "password": config["password"]}}
         )
+        # Default credentials, inherited by every host
+        nr.inventory.defaults.username = config["email"]
+        nr.inventory.defaults.password = config["password"]
 
         # Run tasks with error handling
         results = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: nr.run(task=fetch_device_details, nautobot=nautobot)
+            None, lambda: nr.run(task=fetch_device_details)
         )
 
         # Process results efficiently
@@ -112,6 +98,11 @@ async def main():
             else:
                 logger.info(f"{host}: {result[0].result}")
 
+        # Build the link graph from connected_endpoint data
+        topology = TopologyGraph()
+        topology.update(result[0].result for result in results.values() if not result[0].failed)
+        logger.info(f"Topology: {topology.stats()}")
+
     except Exception as e:
         logger.error(f"Main execution failed: {str(e)}")
         raise
@@ -3,8 +3,10 @@ import asyncio
 import logging
 from typing import Dict, Any, List
 from nornir import InitNornir
-from nornir.core.task import Task, Result
-from nornir_nautobot.plugins.inventory.nautobot import NautobotInventory
+from nornir.core import Nornir
+from nornir.core.inventory import Host
+from nornir.core.task import AggregatedResult, MultiResult, Result
+from nautobot_prefetch_inventory import PrefetchNautobotInventory
 import pynautobot
 
 # Configure logging with minimal output
@@ -39,30 +41,53 @@ query ($device_names: [String!]) {
 }
 """
 
-async def fetch_device_details(task: Task, nautobot: pynautobot.api, device_names: List[str]) -> Result:
-    """Nornir task to fetch details for multiple devices using GraphQL."""
-    try:
-        # Execute GraphQL query for multiple devices
-        gql_response = nautobot.graphql.query(
-            query=GRAPHQL_QUERY,
-            variables={"device_names": device_names},
-            timeout=15
-        )
-        
-        data = gql_response.json.get("data", {}).get("devices", [])
-        if data:
-            logger.info(f"Fetched data for {len(data)} devices")
-            # Map results to host for Nornir compatibility
-            host_result = {device["name"]: device for device in data if device["name"] == task.host.name}
-            if host_result.get(task.host.name):
-                return Result(host=task.host, result=host_result[task.host.name])
-        
-        logger.warning(f"No data for {task.host.name}")
-        return Result(host=task.host, failed=True)
-        
-    except Exception as e:
-        logger.error(f"Failed for {task.host.name}: {str(e)}")
-        return Result(host=task.host, failed=True, exception=e)
+def fetch_batch_details(nautobot: pynautobot.api, device_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch details for a batch of devices with a single GraphQL query, keyed by name."""
+    gql_response = nautobot.graphql.query(
+        query=GRAPHQL_QUERY,
+        variables={"device_names": device_names},
+    )
+    data = (gql_response.json.get("data") or {}).get("devices") or []
+    logger.info(f"Fetched data for {len(data)}/{len(device_names)} devices")
+    return {device["name"]: device for device in data}
+
+def batch_result(hosts: List[Host], devices: Dict[str, Dict[str, Any]], exception: Exception = None) -> Dict[str, MultiResult]:
+    """Split one batch's GraphQL response into per-host Nornir results."""
+    results = {}
+    for host in hosts:
+        multi_result = MultiResult("fetch_device_details")
+        if exception is not None:
+            multi_result.append(Result(host=host, failed=True, exception=exception))
+        elif host.name in devices:
+            multi_result.append(Result(host=host, result=devices[host.name]))
+        else:
+            logger.warning(f"No data for {host.name}")
+            multi_result.append(Result(host=host, failed=True))
+        results[host.name] = multi_result
+    return results
+
+async def run_in_batches(nr: Nornir, nautobot: pynautobot.api, batch_size: int, workers: int) -> AggregatedResult:
+    """Run one GraphQL query per batch of inventory hosts and aggregate the per-host results."""
+    hosts = list(nr.inventory.hosts.values())
+    batches = [hosts[i:i + batch_size] for i in range(0, len(hosts), batch_size)]
+    semaphore = asyncio.Semaphore(workers)
+
+    async def run_batch(batch: List[Host]) -> Dict[str, MultiResult]:
+        async with semaphore:
+            try:
+                devices = await asyncio.to_thread(fetch_batch_details, nautobot, [host.name for host in batch])
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} devices failed: {str(e)}")
+                return batch_result(batch, {}, exception=e)
+        return batch_result(batch, devices)
+
+    aggregated = AggregatedResult("fetch_device_details")
+    for results in await asyncio.gather(*(run_batch(batch) for batch in batches)):
+        aggregated.update(results)
+    nr.data.failed_hosts.update(aggregated.failed_hosts)
+
+    logger.info(f"Ran {len(batches)} GraphQL queries for {len(hosts)} hosts")
+    return aggregated
 
 async def main():
     """Main async function to run Nornir tasks for multiple devices."""
@@ -75,8 +100,8 @@ async def main():
             "password": os.getenv("NAUTOBOT_PASSWORD", ""),
             "ssl_verify": False,  # Set to True in production
             "workers": 5,  # Reduced for bulk query efficiency
-            "timeout": 15,  # Increased timeout for bulk queries
-            "batch_size": 50  # Number of devices per GraphQL query
+            "batch_size": 50,  # Number of devices per GraphQL query
+            "page_size": int(os.getenv("NAUTOBOT_PAGE_SIZE", "1000")),  # 0 walks the REST device list serially
         }
 
         # Initialize pynautobot
@@ -84,50 +109,37 @@ async def main():
             url=config["url"],
             token=config["token"],
             threading=False,
-            verify=config["ssl_verify"],
-            timeout=config["timeout"]
+            verify=config["ssl_verify"]
         )
 
         # Initialize Nornir with NautobotInventory
         nr = InitNornir(
             runner={"plugin": "threaded", "options": {"num_workers": config["workers"]}},
             inventory={
-                "plugin": "NautobotInventory",
+                "plugin": "PrefetchNautobotInventory",
                 "options": {
                     "nautobot_url": config["url"],
                     "nautobot_token": config["token"],
                     "ssl_verify": config["ssl_verify"],
                     "filter_parameters": {"status": "active"},
+                    "page_size": config["page_size"],  # Host list loaded as concurrent GraphQL pages
+                    "workers": 8,
                 },
             },
-            credentials={"defaults": {"username": config["email"], "password": config["password"]}}
         )
+        # Default credentials, inherited by every host
+        nr.inventory.defaults.username = config["email"]
+        nr.inventory.defaults.password = config["password"]
 
-        # Batch devices to avoid overwhelming GraphQL
-        device_names = list(nr.inventory.hosts.keys())
-        batches = [device_names[i:i + config["batch_size"]] for i in range(0, len(device_names), config["batch_size"])]
-
-        # Process batches concurrently
-        for batch in batches:
-            tasks = [
-                asyncio.get_event_loop().run_in_executor(
-                    None, 
-                    lambda host=host, names=batch: nr.run(
-                        task=fetch_device_details, 
-                        nautobot=nautobot, 
-                        device_names=names
-                    )[host.name]
-                )
-                for host in nr.inventory.hosts.values() if host.name in batch
-            ]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        # One GraphQL query per batch, results split out to the matching hosts
+        results = await run_in_batches(nr, nautobot, config["batch_size"], config["workers"])
 
-            # Process results
-            for host_name, result in zip([h.name for h in nr.inventory.hosts.values() if h.name in batch], results):
-                if isinstance(result, Exception) or result[0].failed:
-                    logger.error(f"{host_name}: {result[0].exception or 'No data'}")
-                else:
-                    logger.info(f"{host_name}: {result[0].result}")
+        # Process results
+        for host_name, result in results.items():
+            if result[0].failed:
+                logger.error(f"{host_name}: {result[0].exception or 'No data'}")
+            else:
+                logger.info(f"{host_name}: {result[0].result}")
 
     except Exception as e:
         logger.error(f"Main execution failed: {str(e)}")
@@ -2,9 +2,12 @@ import asyncio
 import aiohttp
 import json
 import os
+import sys
 import logging
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 import time
+from nautobot_stream_decode import DeviceRecord, DevicesStreamDecoder, aiter_records
+from nautobot_transport import QueryMetrics, create_session
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +21,27 @@ logger = logging.getLogger(__name__)
 NAUTOBOT_URL = os.environ.get("NAUTOBOT_URL", "https://demo.nautobot.com")
 NAUTOBOT_TOKEN = os.environ.get("NAUTOBOT_TOKEN", "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
 CHUNK_SIZE = int(os.environ.get("CHUNK_SIZE", 10))  # Number of devices per query
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", 500))  # Number of devices per page in streaming mode
+FETCH_MODE = os.environ.get("FETCH_MODE", "chunks")  # "chunks" (by name) or "stream" (paginate everything)
+COMPACT_RECORDS = os.environ.get("COMPACT_RECORDS", "").lower() in ("1", "true", "yes")  # Stream-decode into DeviceRecord
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk when stream-decoding responses
+
+# HTTP transport tuning
+HTTP_POOL_LIMIT = int(os.environ.get("HTTP_POOL_LIMIT", 100))  # Open connections across all hosts
+HTTP_POOL_LIMIT_PER_HOST = int(os.environ.get("HTTP_POOL_LIMIT_PER_HOST", 20))  # Open connections to Nautobot
+HTTP_KEEPALIVE = float(os.environ.get("HTTP_KEEPALIVE", 30))  # Seconds an idle connection is kept for reuse
+DNS_CACHE_TTL = int(os.environ.get("DNS_CACHE_TTL", 300))  # Seconds a resolved address is cached
+HTTP_TIMEOUT_TOTAL = float(os.environ.get("HTTP_TIMEOUT_TOTAL", 120))  # Whole request
+HTTP_TIMEOUT_CONNECT = float(os.environ.get("HTTP_TIMEOUT_CONNECT", 10))  # Acquiring a connection
+HTTP_TIMEOUT_READ = float(os.environ.get("HTTP_TIMEOUT_READ", 60))  # Between socket reads
+HTTP_COMPRESS = os.environ.get("HTTP_COMPRESS", "true").lower() in ("1", "true", "yes")  # Ask for gzip/deflate
+
+# Metrics dump at the end of a run: "json", "prometheus" or empty to disable
+METRICS_FORMAT = os.environ.get("METRICS_FORMAT", "")
+METRICS_FILE = os.environ.get("METRICS_FILE", "")  # Defaults to stdout
+
+# Per-query metrics for this process
+metrics = QueryMetrics()
 
 # GraphQL query
 QUERY = """
@@ -38,72 +62,279 @@ query ($device_names: [String!]) {
 }
 """
 
+# Device name -> future for a lookup already on the wire (single-flight)
+_in_flight: Dict[str, asyncio.Future] = {}
+
+# Paginated variant of QUERY used by the streaming mode
+PAGE_QUERY = """
+query ($limit: Int!, $offset: Int!) {
+  devices(limit: $limit, offset: $offset) {
+    name
+    site {
+      name
+    }
+    interfaces {
+      name
+      description
+      ip_addresses {
+        address
+      }
+    }
+  }
+}
+"""
+
+def open_session() -> aiohttp.ClientSession:
+    """
+    Create the shared, tuned session used for all GraphQL queries.
+    """
+    return create_session(
+        NAUTOBOT_TOKEN,
+        metrics,
+        pool_limit=HTTP_POOL_LIMIT,
+        pool_limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE,
+        dns_cache_ttl=DNS_CACHE_TTL,
+        total_timeout=HTTP_TIMEOUT_TOTAL,
+        connect_timeout=HTTP_TIMEOUT_CONNECT,
+        read_timeout=HTTP_TIMEOUT_READ,
+        compress=HTTP_COMPRESS,
+    )
+
 async def fetch_device_data(session: aiohttp.ClientSession, device_names: List[str], retries: int = 3) -> Optional[dict]:
     """
     Asynchronously fetch device data for a list of device names using GraphQL.
     """
-    headers = {
-        "Authorization": f"Token {NAUTOBOT_TOKEN}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "query": QUERY,
-        "variables": {"device_names": device_names},
-    }
+    device_names = list(dict.fromkeys(device_names))  # Duplicates add no data to name__in
+    return await run_query(session, QUERY, {"device_names": device_names}, f"{len(device_names)} devices", retries)
+
+async def run_query(session: aiohttp.ClientSession, query: str, variables: dict, label: str, retries: int = 3) -> Optional[list]:
+    """
+    POST a devices query to GraphQL with retries and exponential backoff.
+
+    Headers come from the session (see `open_session`); every attempt is
+    recorded in `metrics`.
+    """
+    # Serialize once so the request size is known and retries reuse the bytes
+    body = json.dumps({"query": query, "variables": variables}).encode()
 
     for attempt in range(1, retries + 1):
         try:
-            start_time = time.time()
-            async with session.post(f"{NAUTOBOT_URL}/graphql/", json=payload, headers=headers) as response:
+            start_time = time.perf_counter()
+            async with session.post(f"{NAUTOBOT_URL}/graphql/", data=body) as response:
+                ttfb = time.perf_counter() - start_time
+                wire_bytes = response.content_length  # None for chunked responses
+
                 if response.status != 200:
-                    logger.error(f"Query failed with status {response.status}: {await response.text()}")
+                    text = await response.text()
+                    metrics.observe_query(ttfb, time.perf_counter() - start_time, response.status,
+                                          len(body), len(text), wire_bytes, 0)
+                    metrics.inc("failures")
+                    logger.error(f"Query failed with status {response.status}: {text}")
                     return None
 
-                data = await response.json()
-                elapsed = time.time() - start_time
-                logger.info(f"Query for {len(device_names)} devices took {elapsed:.2f} seconds")
+                if COMPACT_RECORDS:
+                    # Decode devices one at a time into compact records as the body streams in
+                    decoder = DevicesStreamDecoder()
+                    received = 0
+
+                    async def counted_chunks():
+                        nonlocal received
+                        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                            received += len(chunk)
+                            yield chunk
 
-                if data.get("data"):
-                    return data["data"]["devices"]
+                    devices = [record async for record in aiter_records(counted_chunks(), decoder)]
+                    # No devices array (e.g. {"data": null, "errors": [...]}) is a failure, not zero devices
+                    errors = None if decoder.started else decoder.errors()
+                    if not decoder.started:
+                        devices = None
                 else:
-                    logger.error(f"No data returned: {data.get('errors', 'Unknown error')}")
-                    return None
+                    raw = await response.read()
+                    received = len(raw)
+                    data = json.loads(raw)
+                    devices = data["data"]["devices"] if data.get("data") else None
+                    errors = None if devices is not None else data.get("errors", "Unknown error")
+
+                elapsed = time.perf_counter() - start_time
+                metrics.observe_query(ttfb, elapsed, response.status, len(body), received, wire_bytes,
+                                      len(devices or []))
+                logger.info(f"Query for {label} took {elapsed:.2f} seconds ({ttfb:.2f}s to first byte, {received} bytes)")
+
+                if devices is not None:
+                    return devices
+                metrics.inc("failures")
+                logger.error(f"No data returned: {errors}")
+                return None
 
-        except aiohttp.ClientError as e:
-            logger.warning(f"Attempt {attempt} failed: {str(e)}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Attempt {attempt} failed: {str(e) or type(e).__name__}")
             if attempt < retries:
+                metrics.inc("retries")
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
             else:
-                logger.error(f"Failed after {retries} attempts: {str(e)}")
+                metrics.inc("failures")
+                logger.error(f"Failed after {retries} attempts: {str(e) or type(e).__name__}")
                 return None
 
-async def fetch_all_devices(device_names: List[str]) -> List[dict]:
+async def fetch_all_devices(device_names: List[str], session: Optional[aiohttp.ClientSession] = None) -> List[dict]:
     """
     Fetch device data in parallel chunks.
+
+    Pass `session` to share one connection pool across calls; otherwise a
+    session from `open_session()` is created for this call.
+
+    Duplicate names are queried once, and names already being fetched by a
+    concurrent call are awaited instead of queried again (single-flight).
+    Results come back in the order of `device_names`, duplicates included.
     """
+    unique_names = list(dict.fromkeys(device_names))
+    waiting = {name: _in_flight[name] for name in unique_names if name in _in_flight}
+    to_fetch = [name for name in unique_names if name not in waiting]
+
+    # Register our names before the first await so concurrent callers join them
+    loop = asyncio.get_running_loop()
+    owned = {name: loop.create_future() for name in to_fetch}
+    _in_flight.update(owned)
+
     # Split device names into chunks
-    chunks = [device_names[i:i + CHUNK_SIZE] for i in range(0, len(device_names), CHUNK_SIZE)]
-    logger.info(f"Split {len(device_names)} devices into {len(chunks)} chunks")
+    chunks = [to_fetch[i:i + CHUNK_SIZE] for i in range(0, len(to_fetch), CHUNK_SIZE)]
+    logger.info(
+        f"Split {len(to_fetch)} devices into {len(chunks)} chunks "
+        f"({len(device_names)} requested, {len(unique_names)} unique, {len(waiting)} already in flight)"
+    )
 
-    async with aiohttp.ClientSession() as session:
-        tasks = [fetch_device_data(session, chunk) for chunk in chunks]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+    found = {}
+    try:
+        if session is None:
+            async with open_session() as own_session:
+                results = await asyncio.gather(*[fetch_device_data(own_session, chunk) for chunk in chunks],
+                                               return_exceptions=True)
+        else:
+            results = await asyncio.gather(*[fetch_device_data(session, chunk) for chunk in chunks],
+                                           return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, list):
+                for device in result:
+                    found[device.name if isinstance(device, DeviceRecord) else device["name"]] = device
+            elif result is None:
+                logger.warning("One or more chunks failed to return data")
+    finally:
+        # Always release waiters; a device we could not fetch resolves to None
+        for name, future in owned.items():
+            if not future.done():
+                future.set_result(found.get(name))
+            if _in_flight.get(name) is future:
+                del _in_flight[name]
+
+    for name, future in waiting.items():
+        found[name] = await asyncio.shield(future)
+
+    # Fan results back out in the caller's order
+    return [found[name] for name in device_names if found.get(name)]
+
+async def iter_devices(page_size: int = PAGE_SIZE, session: Optional[aiohttp.ClientSession] = None,
+                       retries: int = 3) -> AsyncIterator[dict]:
+    """
+    Stream every device from Nautobot page by page using limit/offset.
+
+    The next page is requested while the current one is being consumed, so
+    callers get the first device after a single round trip and memory holds
+    at most two pages regardless of inventory size. A page that fails (an
+    error status or GraphQL errors) is requested again with exponential
+    backoff, up to `retries` times, before the stream is given up.
+    """
+    if session is None:
+        async with open_session() as own_session:
+            async for device in iter_devices(page_size, own_session, retries):
+                yield device
+        return
 
-    # Flatten results and filter out None values
-    devices = []
-    for result in results:
-        if isinstance(result, list):
-            devices.extend(result)
-        elif result is None:
-            logger.warning("One or more chunks failed to return data")
+    async def fetch_page(offset: int) -> Optional[list]:
+        variables = {"limit": page_size, "offset": offset}
+        label = f"page offset={offset} limit={page_size}"
+        for attempt in range(1, retries + 1):
+            page = await run_query(session, PAGE_QUERY, variables, label)
+            if page is not None or attempt == retries:
+                return page
+            logger.warning(f"Page at offset {offset} failed (attempt {attempt}); retrying")
+            metrics.inc("retries")
+            await asyncio.sleep(2 ** attempt)  # Exponential backoff
 
-    return devices
+    def request_page(offset: int) -> asyncio.Task:
+        return asyncio.create_task(fetch_page(offset))
+
+    offset = 0
+    pending = request_page(offset)
+    try:
+        while pending is not None:
+            page = await pending
+            if page is None:
+                raise RuntimeError(f"Failed to fetch device page at offset {offset} after {retries} attempts")
+
+            # A short page is the last one; otherwise prefetch the next page
+            offset += page_size
+            pending = request_page(offset) if len(page) == page_size else None
+
+            for device in page:
+                yield device
+    finally:
+        if pending is not None and not pending.done():
+            pending.cancel()
+
+def log_device(device: dict) -> None:
+    """
+    Log a single device with its site, interfaces and IPs.
+    """
+    if isinstance(device, DeviceRecord):
+        device = device.to_dict()
+    logger.info(f"Device: {device['name']}")
+    logger.info(f"Site: {device['site']['name']}")
+    logger.info("Interfaces:")
+    for interface in device['interfaces']:
+        logger.info(f"  - {interface['name']}: {interface['description'] or 'No description'}")
+        for ip in interface['ip_addresses']:
+            logger.info(f"    IP: {ip['address']}")
+
+def report_metrics() -> None:
+    """
+    Log a one-line summary of the run and dump the full metrics if METRICS_FORMAT is set.
+    """
+    counters = metrics.counters
+    logger.info(
+        f"{counters['requests']} queries, {counters['retries']} retries, {counters['failures']} failures, "
+        f"{counters['bytes_out']} bytes out, {counters['bytes_in']} bytes in ({counters['bytes_in_wire']} on the wire), "
+        f"latency p50 <= {metrics.latency.quantile(0.5)}s p99 <= {metrics.latency.quantile(0.99)}s, "
+        f"{counters['connections_created']} connections opened, {counters['connections_reused']} reused"
+    )
+    if METRICS_FORMAT:
+        text = metrics.dump(METRICS_FORMAT, METRICS_FILE or None)
+        if not METRICS_FILE:
+            sys.stdout.write(text)
 
 async def main():
+    try:
+        await run()
+    finally:
+        report_metrics()
+
+async def run():
+    start_time = time.time()
+
+    if FETCH_MODE == "stream":
+        # Process devices as pages arrive instead of buffering the whole inventory
+        count = 0
+        async for device in iter_devices():
+            log_device(device)
+            count += 1
+        elapsed = time.time() - start_time
+        logger.info(f"Streamed {count} devices in {elapsed:.2f} seconds")
+        return
+
     # List of device names to query
     device_names = ["hq-access-01", "den-sw01", "ams-sw01"] * 10  # Example: 30 devices for testing
 
-    start_time = time.time()
     devices = await fetch_all_devices(device_names)
     elapsed = time.time() - start_time
     logger.info(f"Total execution time: {elapsed:.2f} seconds")
@@ -112,13 +343,7 @@ async def main():
         # Pretty print summary
         logger.info(f"Fetched {len(devices)} devices")
         for device in devices:
-            logger.info(f"Device: {device['name']}")
-            logger.info(f"Site: {device['site']['name']}")
-            logger.info("Interfaces:")
-            for interface in device['interfaces']:
-                logger.info(f"  - {interface['name']}: {interface['description'] or 'No description'}")
-                for ip in interface['ip_addresses']:
-                    logger.info(f"    IP: {ip['address']}")
+            log_device(device)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""Canonical interface names, so device output matches Nautobot interfaces by dictionary lookup."""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+# Cisco type abbreviations (IOS, IOS-XE, NX-OS) -> canonical lowercase type
+CISCO_TYPES = {
+    "gi": "gigabitethernet", "gig": "gigabitethernet", "gigabitethernet": "gigabitethernet",
+    "te": "tengigabitethernet", "ten": "tengigabitethernet", "tengig": "tengigabitethernet",
+    "tengige": "tengigabitethernet", "tengigabitethernet": "tengigabitethernet",
+    "fa": "fastethernet", "fastethernet": "fastethernet",
+    "tw": "twogigabitethernet", "twogigabitethernet": "twogigabitethernet",
+    "fi": "fivegigabitethernet", "fivegigabitethernet": "fivegigabitethernet",
+    "twe": "twentyfivegige", "twentyfivegige": "twentyfivegige",
+    "twentyfivegigabitethernet": "twentyfivegige",
+    "fo": "fortygigabitethernet", "fortygige": "fortygigabitethernet",
+    "fortygigabitethernet": "fortygigabitethernet",
+    "hu": "hundredgige", "hundredgige": "hundredgige", "hundredgigabitethernet": "hundredgige",
+    "e": "ethernet", "et": "ethernet", "eth": "ethernet", "ethernet": "ethernet",
+    "po": "port-channel", "portchannel": "port-channel", "port-channel": "port-channel",
+    "vl": "vlan", "vlan": "vlan",
+    "lo": "loopback", "loopback": "loopback",
+    "tu": "tunnel", "tunnel": "tunnel",
+    "mgmt": "mgmt", "management": "mgmt",
+    "nve": "nve",
+}
+
+# Platform slug (or NAPALM driver) -> rule set
+CISCO_PLATFORMS = {"ios", "iosxe", "cisco_ios", "cisco_xe", "nxos", "nxos_ssh", "cisco_nxos"}
+JUNOS_PLATFORMS = {"junos", "juniper_junos"}
+
+# "<type><number>", e.g. "Gi1/0/1", "Ethernet 1/1", "Port-channel10"
+CISCO_NAME = re.compile(r"([a-z][a-z-]*?)\s*(\d\S*)")
+# Junos unit 0 is the port itself, e.g. "xe-0/0/0.0" -> "xe-0/0/0"
+JUNOS_UNIT_ZERO = re.compile(r"\.0$")
+
+
+@lru_cache(maxsize=65536)
+def canonical_interface_name(name: str, platform_slug: Optional[str]) -> str:
+    """
+    Key under which equivalent spellings of an interface name compare equal.
+
+    Memoized on (name, platform), so port names repeated across every
+    device of a platform are only worked out once per process.
+    """
+    key = "".join(name.split()).lower()
+    if platform_slug in CISCO_PLATFORMS:
+        match = CISCO_NAME.fullmatch(key)
+        if match and match.group(1) in CISCO_TYPES:
+            return CISCO_TYPES[match.group(1)] + match.group(2)
+    elif platform_slug in JUNOS_PLATFORMS:
+        return JUNOS_UNIT_ZERO.sub("", key)
+    return key
+
+
+class InterfaceNameIndex:
+    """
+    Maps names seen on a device to the names of its Nautobot interfaces.
+
+    Built once per device from its Nautobot interface names. `resolve()`
+    tries the exact name, then the canonical form, so `Gi1/0/1`,
+    `GigabitEthernet1/0/1` and `gigabitethernet 1/0/1` all find the same
+    interface without another query.
+    """
+
+    def __init__(self, names: Iterable[str], platform_slug: Optional[str]):
+        self.platform_slug = platform_slug
+        self._exact = set()
+        self._canonical: Dict[str, str] = {}
+        for name in names:
+            self._exact.add(name)
+            # The first interface wins if two Nautobot names share a canonical form
+            self._canonical.setdefault(canonical_interface_name(name, platform_slug), name)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """The Nautobot interface name for `name`, or None if the device has no such interface."""
+        if name in self._exact:
+            return name
+        return self._canonical.get(canonical_interface_name(name, self.platform_slug))
@@ -0,0 +1,223 @@
+"""Streaming parsers for interface description output, registered by Nautobot platform slug."""
+
+import re
+import json
+from xml.etree.ElementTree import XMLPullParser, ParseError, fromstring
+from typing import Callable, Dict, Iterator, List, Tuple
+
+# Parser: raw command output -> (interface name, description) pairs
+InterfaceParser = Callable[[str], Iterator[Tuple[str, str]]]
+
+# Platform slug -> (command, parser)
+PARSERS: Dict[str, Tuple[str, InterfaceParser]] = {}
+
+# NAPALM driver -> platform slug whose command and parser match its CLI
+NAPALM_DRIVER_PLATFORMS = {
+    "ios": "ios",
+    "nxos": "nxos",
+    "nxos_ssh": "nxos",
+    "junos": "junos",
+}
+
+
+def register_parser(platform_slug: str, command: str) -> Callable[[InterfaceParser], InterfaceParser]:
+    """Register `parser` as the one used for `command` output on `platform_slug`."""
+    def decorator(parser: InterfaceParser) -> InterfaceParser:
+        PARSERS[platform_slug] = (command, parser)
+        return parser
+    return decorator
+
+
+def get_parser(platform_slug: str) -> Tuple[str, InterfaceParser]:
+    """Return (command, parser) for a platform; raises KeyError if none is registered."""
+    return PARSERS[platform_slug]
+
+
+def parse_interfaces(platform_slug: str, output: str) -> Dict[str, str]:
+    """Parse command output for a platform into interface name -> description."""
+    _, parser = get_parser(platform_slug)
+    return dict(parser(output))
+
+
+# ── Cisco IOS / IOS-XE: `show interfaces` ─────────────────────
+
+# Only two line shapes matter: the "<name> is <state>" header at column 0
+# and the indented "Description:" line. Anchoring the pattern on a literal
+# newline (rather than ^ with MULTILINE) lets the regex engine jump between
+# line starts with a fast literal search, so the dozens of counter lines
+# per interface are skipped without being split or tested in Python.
+IOS_FIRST_LINE = re.compile(r"(\S+) is ")
+IOS_LINES = re.compile(r"\n(?:(\S+) is |[ \t]+Description: ?([^\n]*))")
+
+
+@register_parser("ios", "show interfaces")
+def iter_ios_interfaces(output: str) -> Iterator[Tuple[str, str]]:
+    match = IOS_FIRST_LINE.match(output)
+    name = match.group(1) if match else None
+    description = ""
+    for match in IOS_LINES.finditer(output):
+        if match.group(1) is not None:
+            if name is not None:
+                yield name, description
+            name, description = match.group(1), ""
+        elif name is not None:
+            description = match.group(2).rstrip()
+    if name is not None:
+        yield name, description
+
+
+# ── Cisco NX-OS: `show interface | json` ──────────────────────
+
+ROWS_START = re.compile(r'"ROW_interface"\s*:\s*')
+# Only the two keys we need are matched; the ~40 counter keys per row are
+# skipped by the regex engine instead of being decoded into dicts. A quote
+# inside a JSON string is always escaped, so `"interface":` can only match
+# a real key. NX-OS puts "interface" first in every row, so it starts a row.
+NXOS_KEYS = re.compile(r'"(interface|desc)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _json_string(raw: str) -> str:
+    return json.loads(f'"{raw}"') if "\\" in raw else raw
+
+
+@register_parser("nxos", "show interface | json")
+def iter_nxos_interfaces(output: str) -> Iterator[Tuple[str, str]]:
+    match = ROWS_START.search(output)
+    if match is None:
+        raise ValueError("No ROW_interface in NX-OS output")
+
+    name = None
+    description = ""
+    position = match.end()
+    for match in NXOS_KEYS.finditer(output, position):
+        position = match.end()
+        if match.group(1) == "interface":
+            if name is not None:
+                yield name, description
+            name, description = _json_string(match.group(2)), ""
+        elif name is not None:
+            description = _json_string(match.group(2))
+    if output.find("}", position) < 0:
+        raise ValueError("Truncated NX-OS output")
+    if name is not None:
+        yield name, description
+
+
+# ── Juniper Junos: `show interfaces | display xml` ────────────
+
+XML_FEED_SIZE = 64 * 1024
+
+
+def _local(tag: str) -> str:
+    # Junos tags carry a namespace that changes with the release
+    return tag.rsplit("}", 1)[-1]
+
+
+@register_parser("junos", "show interfaces | display xml")
+def iter_junos_interfaces(output: str) -> Iterator[Tuple[str, str]]:
+    # Pull-parse and free each physical-interface once handled, so memory
+    # stays at one interface regardless of the size of the reply
+    parser = XMLPullParser(events=("end",))
+
+    # The CLI may append a prompt such as "{master:0}" after the reply
+    end = output.rfind(">") + 1
+    if not end:
+        raise ValueError("No XML in Junos output")
+
+    try:
+        for offset in range(0, end, XML_FEED_SIZE):
+            parser.feed(output[offset:min(offset + XML_FEED_SIZE, end)])
+            for _, element in parser.read_events():
+                if _local(element.tag) != "physical-interface":
+                    continue
+                # Direct children only: logical interfaces have their own name and description
+                name = description = ""
+                for child in element:
+                    tag = _local(child.tag)
+                    if tag == "name":
+                        name = (child.text or "").strip()
+                    elif tag == "description":
+                        description = (child.text or "").strip()
+                if name:
+                    yield name, description
+                element.clear()
+    except ParseError as e:
+        raise ValueError(f"Invalid Junos XML output: {str(e)}")
+
+
+# ── LLDP neighbors ────────────────────────────────────────────
+
+# Parser: raw command output -> {local interface: [{"hostname": ..., "port": ...}]},
+# the same shape as NAPALM's get_lldp_neighbors()
+LldpParser = Callable[[str], Dict[str, List[Dict[str, str]]]]
+
+# Platform slug -> (command, parser)
+LLDP_PARSERS: Dict[str, Tuple[str, LldpParser]] = {}
+
+
+def register_lldp_parser(platform_slug: str, command: str) -> Callable[[LldpParser], LldpParser]:
+    """Register `parser` as the one used for `command` LLDP output on `platform_slug`."""
+    def decorator(parser: LldpParser) -> LldpParser:
+        LLDP_PARSERS[platform_slug] = (command, parser)
+        return parser
+    return decorator
+
+
+def get_lldp_parser(platform_slug: str) -> Tuple[str, LldpParser]:
+    """Return (command, parser) for a platform's LLDP neighbors; raises KeyError if none is registered."""
+    return LLDP_PARSERS[platform_slug]
+
+
+IOS_LLDP_FIELDS = re.compile(r"^(Local Intf|Port id|System Name): ?(.*?)\s*$", re.MULTILINE)
+
+
+@register_lldp_parser("ios", "show lldp neighbors detail")
+def parse_ios_lldp(output: str) -> Dict[str, List[Dict[str, str]]]:
+    neighbors: Dict[str, List[Dict[str, str]]] = {}
+    entry: Dict[str, str] = {}
+
+    def flush():
+        if entry.get("Local Intf"):
+            neighbors.setdefault(entry["Local Intf"], []).append(
+                {"hostname": entry.get("System Name", ""), "port": entry.get("Port id", "")}
+            )
+
+    for match in IOS_LLDP_FIELDS.finditer(output):
+        field, value = match.groups()
+        # Each neighbor block starts with a new "Local Intf" or repeats a field already seen
+        if field in entry:
+            flush()
+            entry = {}
+        entry[field] = value
+    flush()
+    return neighbors
+
+
+@register_lldp_parser("nxos", "show lldp neighbors detail | json")
+def parse_nxos_lldp(output: str) -> Dict[str, List[Dict[str, str]]]:
+    rows = json.loads(output).get("TABLE_nbor_detail", {}).get("ROW_nbor_detail", [])
+    if isinstance(rows, dict):
+        rows = [rows]
+    neighbors: Dict[str, List[Dict[str, str]]] = {}
+    for row in rows:
+        neighbors.setdefault(row["l_port_id"], []).append({"hostname": row.get("sys_name", ""), "port": row.get("port_id", "")})
+    return neighbors
+
+
+@register_lldp_parser("junos", "show lldp neighbors | display xml")
+def parse_junos_lldp(output: str) -> Dict[str, List[Dict[str, str]]]:
+    try:
+        root = fromstring(output[:output.rfind(">") + 1])
+    except ParseError as e:
+        raise ValueError(f"Invalid Junos XML output: {str(e)}")
+    neighbors: Dict[str, List[Dict[str, str]]] = {}
+    for element in root.iter():
+        if _local(element.tag) != "lldp-neighbor-information":
+            continue
+        fields = {_local(child.tag): (child.text or "").strip() for child in element}
+        local = fields.get("lldp-local-port-id") or fields.get("lldp-local-interface")
+        if local:
+            neighbors.setdefault(local, []).append(
+                {"hostname": fields.get("lldp-remote-system-name", ""), "port": fields.get("lldp-remote-port-id", "")}
+            )
+    return neighbors
@@ -0,0 +1,59 @@
+"""Diff-and-write helpers for the interface description jobs."""
+
+from typing import Dict, Optional
+
+from django.db import transaction
+from django.utils import timezone
+from nautobot.dcim.models import Interface
+
+from nautobot_interface_names import InterfaceNameIndex
+
+BULK_UPDATE_FIELDS = ["description", "status", "last_updated"]
+BULK_UPDATE_BATCH_SIZE = 500
+
+
+def sync_interface_descriptions(device, descriptions: Dict[str, str], status, logger,
+                                platform_slug: Optional[str] = None) -> Dict[str, int]:
+    """
+    Write `descriptions` (interface name -> description) to `device`'s interfaces.
+
+    All interfaces of the device are loaded in one query and compared in
+    memory; names are matched through an InterfaceNameIndex for
+    `platform_slug`, so abbreviations such as `Gi1/0/1` find
+    `GigabitEthernet1/0/1`. Only interfaces whose description or status
+    differ are validated and written, with a single `bulk_update` in one
+    transaction.
+    `bulk_update` skips `auto_now`, so `last_updated` is set here to keep
+    incremental syncs that filter on it working. Returns counts of
+    changed, unchanged and missing interfaces.
+    """
+    existing = {iface.name: iface for iface in Interface.objects.filter(device=device).select_related("status")}
+    index = InterfaceNameIndex(existing, platform_slug)
+    now = timezone.now()
+    changed = []
+    unchanged = 0
+    missing = 0
+
+    for name, description in descriptions.items():
+        nautobot_name = index.resolve(name)
+        if nautobot_name is None:
+            logger.warning(f"Interface {name} not found on device {device.name}. Skipping.")
+            missing += 1
+            continue
+        iface = existing[nautobot_name]
+        if iface.description == description and iface.status_id == status.pk:
+            unchanged += 1
+            continue
+
+        iface.description = description
+        iface.status = status
+        iface.last_updated = now
+        iface.full_clean()  # Same validation validated_save() would run
+        changed.append(iface)
+        logger.info(f"Updated description for {device.name} interface {nautobot_name}: {description}")
+
+    if changed:
+        with transaction.atomic():
+            Interface.objects.bulk_update(changed, BULK_UPDATE_FIELDS, batch_size=BULK_UPDATE_BATCH_SIZE)
+
+    return {"changed": len(changed), "unchanged": unchanged, "missing": missing}
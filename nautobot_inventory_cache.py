@@ -0,0 +1,299 @@
+"""Local SQLite cache of Nautobot devices, interfaces and IP addresses with incremental sync."""
+
+import json
+import time
+import sqlite3
+import logging
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import pynautobot
+
+logger = logging.getLogger("nautobot-inventory-cache")
+
+# Superset of the fields read by the GraphQL scripts in this repo
+GRAPHQL_QUERY = """
+query ($device_names: [String!]) {
+  devices(name__in: $device_names) {
+    name
+    site {
+      name
+    }
+    platform {
+      name
+    }
+    primary_ip4 {
+      address
+    }
+    interfaces {
+      name
+      description
+      ip_addresses {
+        address
+      }
+      connected_endpoint {
+        __typename
+        ... on InterfaceType {
+          device {
+            name
+          }
+          name
+        }
+      }
+    }
+  }
+}
+"""
+
+# Names only, used for the deletion reconciliation pass
+NAMES_QUERY = """
+query ($status: [String]) {
+  devices(status: $status) {
+    name
+  }
+}
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    name        TEXT PRIMARY KEY,
+    site        TEXT,
+    platform    TEXT,
+    primary_ip4 TEXT,
+    synced_at   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS interfaces (
+    device              TEXT NOT NULL REFERENCES devices(name) ON DELETE CASCADE,
+    name                TEXT NOT NULL,
+    description         TEXT,
+    connected_device    TEXT,
+    connected_interface TEXT,
+    PRIMARY KEY (device, name)
+);
+CREATE TABLE IF NOT EXISTS ip_addresses (
+    device    TEXT NOT NULL REFERENCES devices(name) ON DELETE CASCADE,
+    interface TEXT NOT NULL,
+    address   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ip_addresses_device ON ip_addresses(device, interface);
+CREATE INDEX IF NOT EXISTS ip_addresses_address ON ip_addresses(address);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class InventoryCache:
+    """
+    On-disk cache of Nautobot device, interface and IP records.
+
+    `sync()` refreshes only devices whose device, interface or IP records
+    changed since the last run (via Nautobot's `last_updated__gte` filter),
+    then reconciles deletions against a names-only listing. A full refresh
+    runs on the first sync and every `full_sync_interval` seconds to pick up
+    interface and IP deletions, which leave no `last_updated` trace.
+    `load_devices()` returns records in the same shape as the GraphQL
+    `devices` query, so scripts can swap it in for a live fetch.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        workers: int = 8,
+        full_sync_interval: int = 86400,
+        clock_skew: int = 60,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.full_sync_interval = full_sync_interval
+        self.clock_skew = clock_skew  # Overlap between runs to tolerate client/server clock drift
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # ── sync ──────────────────────────────────────────────────
+
+    def _get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, key: str, value: str) -> None:
+        self.conn.execute(
+            "INSERT INTO sync_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _changed_device_names(self, nautobot: pynautobot.api, since: str, status: str) -> Set[str]:
+        """Names of devices whose own, interface or IP records changed since `since`."""
+        names = {dev.name for dev in nautobot.dcim.devices.filter(status=status, last_updated__gte=since)}
+
+        for iface in nautobot.dcim.interfaces.filter(last_updated__gte=since):
+            if iface.device:
+                names.add(iface.device.name)
+
+        for ip in nautobot.ipam.ip_addresses.filter(last_updated__gte=since):
+            assigned = dict(ip).get("assigned_object") or {}
+            device = assigned.get("device") or {}
+            if device.get("name"):
+                names.add(device["name"])
+
+        return names
+
+    def _live_device_names(self, nautobot: pynautobot.api, status: str) -> Set[str]:
+        response = nautobot.graphql.query(query=NAMES_QUERY, variables={"status": [status]})
+        return {dev["name"] for dev in self._devices(response.json)}
+
+    def _fetch_batch(self, nautobot: pynautobot.api, device_names: List[str]) -> List[Dict[str, Any]]:
+        response = nautobot.graphql.query(query=GRAPHQL_QUERY, variables={"device_names": device_names})
+        return self._devices(response.json)
+
+    @staticmethod
+    def _devices(body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        # GraphQL errors arrive with HTTP 200 and "data": null; fail the sync
+        # before last_sync moves rather than treat them as zero devices
+        if body.get("errors"):
+            raise RuntimeError(f"Nautobot GraphQL query failed: {body['errors']}")
+        return (body.get("data") or {}).get("devices") or []
+
+    def _fetch_devices(self, nautobot: pynautobot.api, device_names: List[str]) -> Iterable[List[Dict[str, Any]]]:
+        batches = [device_names[i:i + self.batch_size] for i in range(0, len(device_names), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            yield from pool.map(lambda batch: self._fetch_batch(nautobot, batch), batches)
+
+    def _store(self, devices: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        names = [(dev["name"],) for dev in devices]
+        self.conn.executemany("DELETE FROM interfaces WHERE device = ?", names)
+        self.conn.executemany("DELETE FROM ip_addresses WHERE device = ?", names)
+        self.conn.executemany(
+            "INSERT INTO devices (name, site, platform, primary_ip4, synced_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET site = excluded.site, platform = excluded.platform, "
+            "primary_ip4 = excluded.primary_ip4, synced_at = excluded.synced_at",
+            [
+                (
+                    dev["name"],
+                    (dev.get("site") or {}).get("name"),
+                    (dev.get("platform") or {}).get("name"),
+                    (dev.get("primary_ip4") or {}).get("address"),
+                    now,
+                )
+                for dev in devices
+            ],
+        )
+
+        interfaces, addresses = [], []
+        for dev in devices:
+            for iface in dev.get("interfaces") or []:
+                peer = iface.get("connected_endpoint") or {}
+                interfaces.append((
+                    dev["name"],
+                    iface["name"],
+                    iface.get("description"),
+                    (peer.get("device") or {}).get("name"),
+                    peer.get("name"),
+                ))
+                addresses.extend((dev["name"], iface["name"], ip["address"]) for ip in iface.get("ip_addresses") or [])
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO interfaces (device, name, description, connected_device, connected_interface) "
+            "VALUES (?, ?, ?, ?, ?)",
+            interfaces,
+        )
+        self.conn.executemany("INSERT INTO ip_addresses (device, interface, address) VALUES (?, ?, ?)", addresses)
+
+    def sync(self, nautobot: pynautobot.api, status: str = "active") -> Dict[str, int]:
+        """Bring the cache up to date with Nautobot and return counts of what changed."""
+        started = datetime.now(timezone.utc)
+        since = self._get_state("last_sync")
+        last_full = float(self._get_state("last_full_sync") or 0)
+        full = since is None or time.time() - last_full > self.full_sync_interval
+
+        live_names = self._live_device_names(nautobot, status)
+        cached_names = {row[0] for row in self.conn.execute("SELECT name FROM devices")}
+
+        if full:
+            to_fetch = live_names
+        else:
+            # Changed devices plus any that appeared without a recorded change
+            to_fetch = (self._changed_device_names(nautobot, since, status) | (live_names - cached_names)) & live_names
+        deleted = cached_names - live_names
+
+        fetched = 0
+        for devices in self._fetch_devices(nautobot, sorted(to_fetch)):
+            with self.conn:
+                self._store(devices)
+            fetched += len(devices)
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM devices WHERE name = ?", [(name,) for name in deleted])
+            self._set_state("last_sync", (started - timedelta(seconds=self.clock_skew)).isoformat())
+            if full:
+                self._set_state("last_full_sync", str(started.timestamp()))
+
+        stats = {"full": int(full), "fetched": fetched, "deleted": len(deleted), "total": len(live_names)}
+        logger.info(
+            f"{'Full' if full else 'Incremental'} sync: refreshed {fetched} devices, "
+            f"removed {len(deleted)}, {len(live_names)} total"
+        )
+        return stats
+
+    # ── read ──────────────────────────────────────────────────
+
+    def load_devices(self, device_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Return cached devices shaped like the GraphQL `devices` query results."""
+        if device_names is None:
+            rows = self.conn.execute("SELECT name, site, platform, primary_ip4 FROM devices ORDER BY name").fetchall()
+        else:
+            rows = []
+            for i in range(0, len(device_names), 500):  # Stay under SQLite's bound parameter limit
+                chunk = device_names[i:i + 500]
+                rows.extend(self.conn.execute(
+                    f"SELECT name, site, platform, primary_ip4 FROM devices WHERE name IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall())
+
+        devices = {
+            name: {
+                "name": name,
+                "site": {"name": site} if site else None,
+                "platform": {"name": platform} if platform else None,
+                "primary_ip4": {"address": primary_ip4} if primary_ip4 else None,
+                "interfaces": [],
+            }
+            for name, site, platform, primary_ip4 in rows
+        }
+
+        interfaces = {}
+        for device, name, description, peer_device, peer_name in self.conn.execute(
+            "SELECT device, name, description, connected_device, connected_interface FROM interfaces ORDER BY device, name"
+        ):
+            if device not in devices:
+                continue
+            iface = {
+                "name": name,
+                "description": description,
+                "ip_addresses": [],
+                "connected_endpoint": (
+                    {"__typename": "InterfaceType", "device": {"name": peer_device}, "name": peer_name}
+                    if peer_device else None
+                ),
+            }
+            devices[device]["interfaces"].append(iface)
+            interfaces[(device, name)] = iface
+
+        for device, interface, address in self.conn.execute("SELECT device, interface, address FROM ip_addresses"):
+            iface = interfaces.get((device, interface))
+            if iface is not None:
+                iface["ip_addresses"].append({"address": address})
+
+        return list(devices.values())
@@ -0,0 +1,101 @@
+"""Buffered job logging: one summary row per device, details in a downloadable file."""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+# Value for the jobs' "log_mode" ChoiceVar
+LOG_MODE_CHOICES = (
+    ("detailed", "Detailed (one log entry per event)"),
+    ("summary", "Summary (one log entry per device, details as a file)"),
+)
+
+
+class DeviceLog:
+    """Logger-shaped view of a JobLog for one device, for helpers that take a `logger`."""
+
+    def __init__(self, job_log: "JobLog", device):
+        self.job_log = job_log
+        self.device = device
+
+    def info(self, message: str) -> None:
+        self.job_log.log(logging.INFO, message, self.device)
+
+    def warning(self, message: str) -> None:
+        self.job_log.log(logging.WARNING, message, self.device)
+
+    def error(self, message: str) -> None:
+        self.job_log.log(logging.ERROR, message, self.device)
+
+
+class JobLog:
+    """
+    Per-device event log in front of a job's logger.
+
+    Every job log call becomes a JobLogEntry row, so on large runs the
+    per-interface messages outnumber the interface writes. In summary mode
+    info events are only buffered; warnings and errors are still logged
+    as they happen, each device gets a single summary row, and the full
+    event list is attached to the job result as a JSON file by `save()`.
+    Detailed mode logs every event as before.
+    """
+
+    def __init__(self, logger, summarize: bool = False):
+        self.logger = logger
+        self.summarize = summarize
+        self.events: List[Dict[str, Any]] = []
+        self.summaries: Dict[str, Dict[str, int]] = {}
+
+    def device(self, device) -> DeviceLog:
+        return DeviceLog(self, device)
+
+    def log(self, level: int, message: str, device=None) -> None:
+        self.events.append({
+            "time": datetime.now(timezone.utc).isoformat(),
+            "level": logging.getLevelName(level).lower(),
+            "device": device.name if device is not None else None,
+            "message": message,
+        })
+        if level >= logging.WARNING or not self.summarize:
+            self.logger.log(level, message)
+
+    def info(self, message: str, device=None) -> None:
+        self.log(logging.INFO, message, device)
+
+    def warning(self, message: str, device=None) -> None:
+        self.log(logging.WARNING, message, device)
+
+    def error(self, message: str, device=None) -> None:
+        self.log(logging.ERROR, message, device)
+
+    def summary(self, device, counts: Dict[str, int]) -> None:
+        """Record a device's interface counts and log them as its one summary row."""
+        self.summaries[device.name] = counts
+        message = (
+            f"{device.name}: {counts['changed']} updated, {counts['unchanged']} unchanged, "
+            f"{counts['missing']} not in Nautobot."
+        )
+        self.events.append({
+            "time": datetime.now(timezone.utc).isoformat(),
+            "level": "info",
+            "device": device.name,
+            "message": message,
+        })
+        # Ties the row to the device in the job result UI
+        self.logger.info(message, extra={"object": device, "grouping": "summary"})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"summaries": self.summaries, "events": self.events}
+
+    def save(self, job, filename: str) -> None:
+        """Attach the detailed log to the job result (summary mode only)."""
+        if not self.summarize:
+            return
+        create_file = getattr(job, "create_file", None)
+        if create_file is None:
+            # Job output files need Nautobot 2.1+
+            self.logger.warning(f"This Nautobot version cannot attach files to job results; {len(self.events)} detailed log events were not saved.")
+            return
+        create_file(filename, json.dumps(self.to_dict(), indent=2))
+        self.logger.info(f"Detailed log for {len(self.summaries)} devices ({len(self.events)} events) saved as {filename}.")
@@ -0,0 +1,94 @@
+"""Fan a device job out across Celery workers as one child job per shard of devices."""
+
+import time
+from typing import Any, Dict, List, Sequence
+
+from nautobot.core.celery import app as celery_app
+from nautobot.extras.choices import JobResultStatusChoices
+from nautobot.extras.models import JobResult
+from nautobot.utilities.exceptions import JobException
+
+SHARD_POLL_INTERVAL = 5  # Seconds between child status checks
+
+
+def shard(items: Sequence, shard_size: int) -> List[List]:
+    """Split `items` into consecutive chunks of at most `shard_size`."""
+    return [list(items[i:i + shard_size]) for i in range(0, len(items), shard_size)]
+
+
+def revoke_children(child_ids: List) -> None:
+    """Revoke child jobs in Celery and mark their job results REVOKED; a JobResult's pk is its task ID."""
+    for child_id in child_ids:
+        celery_app.control.revoke(str(child_id), terminate=True)
+    # A child that finished since the last poll keeps its own status
+    JobResult.objects.filter(pk__in=child_ids).exclude(
+        status__in=JobResultStatusChoices.READY_STATES
+    ).update(status=JobResultStatusChoices.STATUS_REVOKED)
+
+
+def run_sharded(job, devices, shard_size: int, shard_timeout: int, **job_kwargs) -> Dict[str, Any]:
+    """
+    Run `job` as child jobs of `shard_size` devices each and aggregate their results.
+
+    Each child is the same job, enqueued through JobResult.enqueue_job with
+    its shard of device IDs and `shard_size=0`, so it runs unsharded on
+    whichever worker picks it up and shows up as its own job result. This
+    job waits for every child (up to `shard_timeout` seconds) while holding
+    one worker, so the queue needs at least two workers to make progress.
+    Children still unfinished at the timeout are revoked (terminated if
+    already running) and marked REVOKED, so nothing keeps writing after
+    the run is reported. Raises JobException listing the failed or revoked
+    shards, once all shards have finished or the timeout expired.
+    """
+    device_ids = [str(device.pk) for device in devices]
+    shards = shard(device_ids, shard_size)
+    job_model = job.job_result.job_model
+
+    children = []
+    for device_shard in shards:
+        child = JobResult.enqueue_job(job_model, job.user, **{**job_kwargs, "devices": device_shard, "shard_size": 0})
+        children.append(child.pk)
+    job.logger.info(f"Split {len(device_ids)} devices into {len(shards)} shards of up to {shard_size} devices.")
+
+    # Wait for every child; a worker-bound poll, not a busy loop
+    deadline = time.monotonic() + shard_timeout
+    finished = {}
+    while len(finished) < len(children) and time.monotonic() < deadline:
+        time.sleep(SHARD_POLL_INTERVAL)
+        for child in JobResult.objects.filter(pk__in=children).exclude(pk__in=list(finished)):
+            if child.status in JobResultStatusChoices.READY_STATES:
+                finished[child.pk] = child
+                job.logger.info(f"Shard {children.index(child.pk) + 1}/{len(shards)} finished: {child.status} ({len(finished)}/{len(shards)} done).")
+
+    unfinished = [child_id for child_id in children if child_id not in finished]
+    if unfinished:
+        revoke_children(unfinished)
+        job.logger.warning(f"Revoked {len(unfinished)} shards still running after {shard_timeout} seconds.")
+
+    results = {}
+    failures = []
+    for index, child_id in enumerate(children, start=1):
+        child = finished.get(child_id)
+        if child is None:
+            failures.append(f"shard {index} did not finish within {shard_timeout} seconds and was revoked (job result {child_id})")
+        elif child.status != JobResultStatusChoices.STATUS_SUCCESS:
+            # Failed Celery results are stored as {"exc_type": ..., "exc_message": ...}
+            message = child.result.get("exc_message", child.result) if isinstance(child.result, dict) else child.result
+            failures.append(f"shard {index} {child.status.lower()}: {message}")
+        else:
+            results[str(index)] = child.result
+
+    # Sum the numeric fields the children return, e.g. {"devices": 50, "skipped": 12}
+    totals: Dict[str, int] = {}
+    for result in results.values():
+        for key, value in (result or {}).items():
+            if isinstance(value, int):
+                totals[key] = totals.get(key, 0) + value
+    job.logger.info(f"Sharded run: {len(results)}/{len(shards)} shards succeeded, totals {totals}.")
+
+    summary = {"devices": len(device_ids), "shards": len(shards), "succeeded": len(results), "totals": totals, "results": results}
+    if failures:
+        for failure in failures:
+            job.logger.error(f"Sharded run: {failure}")
+        raise JobException(f"{len(failures)} of {len(shards)} shards failed: {'; '.join(failures)}")
+    return summary
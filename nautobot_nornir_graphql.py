@@ -2,11 +2,10 @@ import os
 import asyncio
 import logging
 from typing import Dict, Any
-import pynautobot
 from nornir import InitNornir
 from nornir.core.task import Task, Result
 from nornir.core.inventory import Host
-from nornir_nautobot.plugins.inventory.nautobot import NautobotInventory
+from nautobot_prefetch_inventory import PrefetchNautobotInventory
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,8 +13,8 @@ logger = logging.getLogger(__name__)
 
 # GraphQL query to fetch device details with interfaces
 GRAPHQL_QUERY = """
-query ($device_name: String!) {
-  devices(name: $device_name) {
+query ($device_names: [String!]) {
+  devices(name__in: $device_names) {
     name
     site {
       name
@@ -31,26 +30,16 @@ query ($device_name: String!) {
 }
 """
 
-async def fetch_device_details(task: Task, nautobot: pynautobot.api) -> Result:
-    """Nornir task to fetch device details using GraphQL query."""
-    try:
-        device_name = task.host.name
-        variables = {"device_name": device_name}
-        
-        # Execute GraphQL query
-        gql_response = nautobot.graphql.query(query=GRAPHQL_QUERY, variables=variables)
-        
-        if gql_response.json.get("data") and gql_response.json["data"].get("devices"):
-            device_data = gql_response.json["data"]["devices"][0]
-            logger.info(f"Successfully fetched data for {device_name}")
-            return Result(host=task.host, result=device_data)
-        else:
-            logger.warning(f"No data found for {device_name}")
-            return Result(host=task.host, result=None, failed=True)
-            
-    except Exception as e:
-        logger.error(f"Error fetching data for {device_name}: {str(e)}")
-        return Result(host=task.host, result=str(e), failed=True)
+def fetch_device_details(task: Task) -> Result:
+    """Nornir task returning the device details prefetched by the inventory."""
+    device_name = task.host.name
+    device_data = task.host.data.get("graphql")
+    if device_data:
+        logger.info(f"Loaded prefetched data for {device_name}")
+        return Result(host=task.host, result=device_data)
+
+    logger.warning(f"No data found for {device_name}")
+    return Result(host=task.host, result=None, failed=True)
 
 async def main():
     """Main async function to initialize Nornir and run GraphQL queries."""
@@ -60,14 +49,9 @@ async def main():
         nautobot_token = os.getenv("NAUTOBOT_TOKEN", "aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa")
         username = os.getenv("NAUTOBOT_USERNAME", "admin")
         password = os.getenv("NAUTOBOT_PASSWORD", "admin")
-
-        # Initialize pynautobot
-        nautobot = pynautobot.api(
-            url=nautobot_url,
-            token=nautobot_token,
-            threading=False,  # Disable threading for async compatibility
-            verify=False  # Set to True in production with valid SSL certs
-        )
+        # Hosts per inventory page (0 walks the REST device list serially) and lazy GraphQL prefetch
+        page_size = int(os.getenv("NAUTOBOT_PAGE_SIZE", "1000"))
+        lazy = os.getenv("NAUTOBOT_LAZY_INVENTORY", "false").lower() == "true"
 
         # Initialize Nornir with NautobotInventory
         nr = InitNornir(
@@ -78,33 +62,26 @@ async def main():
                 },
             },
             inventory={
-                "plugin": "NautobotInventory",
+                "plugin": "PrefetchNautobotInventory",
                 "options": {
                     "nautobot_url": nautobot_url,
                     "nautobot_token": nautobot_token,
                     "ssl_verify": False,  # Set to True in production
                     "filter_parameters": {"status": "active"},  # Optional filter
+                    "graphql_query": GRAPHQL_QUERY,  # Prefetched for all hosts in bulk
+                    "page_size": page_size,  # Host list loaded as concurrent GraphQL pages
+                    "workers": 8,
+                    "lazy": lazy,
                 },
             },
-            # Set default credentials
-            credentials={
-                "defaults": {
-                    "username": username,
-                    "password": password,
-                }
-            }
         )
 
-        # Add credentials to each host
-        for host in nr.inventory.hosts.values():
-            host.username = username
-            host.password = password
+        # Default credentials, inherited by every host
+        nr.inventory.defaults.username = username
+        nr.inventory.defaults.password = password
 
-        # Run the GraphQL query task for all devices
-        results = nr.run(
-            task=fetch_device_details,
-            nautobot=nautobot
-        )
+        # Read the prefetched GraphQL data for all devices
+        results = nr.run(task=fetch_device_details)
 
         # Process results
         for host_name, result in results.items():
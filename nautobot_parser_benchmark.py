@@ -0,0 +1,271 @@
+"""Benchmark the interface parsers on large IOS, NX-OS and Junos outputs."""
+
+import os
+import json
+import time
+import random
+import argparse
+import tracemalloc
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+from typing import Callable, Dict, List
+
+from nautobot_interface_parsers import PARSERS, parse_interfaces
+
+try:
+    import xmltodict
+except ImportError:
+    xmltodict = None
+
+
+# ── corpus ────────────────────────────────────────────────────
+
+def _description(rng: random.Random, i: int) -> str:
+    # Roughly a third of ports have no description, like a typical access layer
+    if rng.random() < 0.33:
+        return ""
+    return rng.choice([f"uplink to core-{i % 8:02d} Et{i % 48}/1", f"server rack{i % 40} u{i % 42}", f"AP-{i:05d} <poe>"])
+
+
+def generate_ios(interfaces: int, seed: int = 0) -> str:
+    """`show interfaces` output in the IOS-XE layout, about 30 lines per interface."""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(interfaces):
+        name = f"GigabitEthernet{i // 2304 + 1}/{i // 48 % 48}/{i % 48 + 1}"
+        state = rng.choice(["up, line protocol is up (connected)", "down, line protocol is down (notconnect)",
+                            "administratively down, line protocol is down (disabled)"])
+        description = _description(rng, i)
+        lines = [
+            f"{name} is {state}",
+            f"  Hardware is Gigabit Ethernet, address is 00a1.{i % 65536:04x}.0001 (bia 00a1.{i % 65536:04x}.0001)",
+        ]
+        if description:
+            lines.append(f"  Description: {description}")
+        lines += [
+            "  MTU 1500 bytes, BW 1000000 Kbit/sec, DLY 10 usec, ",
+            "     reliability 255/255, txload 1/255, rxload 1/255",
+            "  Encapsulation ARPA, loopback not set",
+            "  Keepalive set (10 sec)",
+            "  Full-duplex, 1000Mb/s, media type is 10/100/1000BaseTX",
+            "  input flow-control is on, output flow-control is unsupported ",
+            "  ARP type: ARPA, ARP Timeout 04:00:00",
+            "  Last input 00:00:01, output 00:00:00, output hang never",
+            "  Last clearing of \"show interface\" counters never",
+            "  Input queue: 0/2000/0/0 (size/max/drops/flushes); Total output drops: 0",
+            "  Queueing strategy: fifo",
+            "  Output queue: 0/40 (size/max)",
+            f"  5 minute input rate {rng.randrange(10 ** 6)} bits/sec, {rng.randrange(1000)} packets/sec",
+            f"  5 minute output rate {rng.randrange(10 ** 6)} bits/sec, {rng.randrange(1000)} packets/sec",
+            f"     {rng.randrange(10 ** 9)} packets input, {rng.randrange(10 ** 12)} bytes, 0 no buffer",
+            f"     Received {rng.randrange(10 ** 6)} broadcasts ({rng.randrange(10 ** 6)} multicasts)",
+            "     0 runts, 0 giants, 0 throttles ",
+            "     0 input errors, 0 CRC, 0 frame, 0 overrun, 0 ignored",
+            "     0 watchdog, 123456 multicast, 0 pause input",
+            "     0 input packets with dribble condition detected",
+            f"     {rng.randrange(10 ** 9)} packets output, {rng.randrange(10 ** 12)} bytes, 0 underruns",
+            "     0 output errors, 0 collisions, 1 interface resets",
+            "     0 unknown protocol drops",
+            "     0 babbles, 0 late collision, 0 deferred",
+            "     0 lost carrier, 0 no carrier, 0 pause output",
+            "     0 output buffer failures, 0 output buffers swapped out",
+        ]
+        blocks.append("\n".join(lines))
+    return "\n".join(blocks) + "\n"
+
+
+def generate_nxos(interfaces: int, seed: int = 0) -> str:
+    """`show interface | json` output with the usual ~40 keys per row."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(interfaces):
+        row = {
+            "interface": f"Ethernet{i // 64 + 1}/{i % 64 + 1}",
+            "state": rng.choice(["up", "down"]),
+            "admin_state": "up",
+            "share_state": "Dedicated",
+            "eth_hw_desc": "100/1000/10000 Ethernet",
+            "eth_hw_addr": f"00a1.{i % 65536:04x}.0001",
+            "eth_bia_addr": f"00a1.{i % 65536:04x}.0001",
+        }
+        description = _description(rng, i)
+        if description:
+            row["desc"] = description
+        row.update({
+            "eth_mtu": "9216", "eth_bw": 10000000, "eth_dly": 10, "eth_reliability": "255",
+            "eth_txload": "1", "eth_rxload": "1", "medium": "broadcast", "eth_mode": "trunk",
+            "eth_duplex": "full", "eth_speed": "10 Gb/s", "eth_media": "10G", "eth_beacon": "off",
+            "eth_autoneg": "on", "eth_in_flowctrl": "off", "eth_out_flowctrl": "off",
+            "eth_mdix": "off", "eth_ratemode": "dedicated", "eth_swt_monitor": "off",
+            "eth_ethertype": "0x8100", "eth_eee_state": "n/a", "eth_link_flapped": "1week(s) 2day(s)",
+            "eth_clear_counters": "never", "eth_reset_cntr": 2, "eth_load_interval1_rx": 30,
+            "eth_inrate1_bits": str(rng.randrange(10 ** 9)), "eth_inrate1_pkts": str(rng.randrange(10 ** 6)),
+            "eth_load_interval1_tx": "30", "eth_outrate1_bits": str(rng.randrange(10 ** 9)),
+            "eth_outrate1_pkts": str(rng.randrange(10 ** 6)), "eth_inucast": rng.randrange(10 ** 12),
+            "eth_inmcast": rng.randrange(10 ** 9), "eth_inbcast": rng.randrange(10 ** 6),
+            "eth_inpkts": rng.randrange(10 ** 12), "eth_inbytes": rng.randrange(10 ** 15),
+            "eth_outucast": rng.randrange(10 ** 12), "eth_outpkts": rng.randrange(10 ** 12),
+            "eth_outbytes": rng.randrange(10 ** 15), "eth_crc": "0", "eth_giants": "0",
+        })
+        rows.append(row)
+    return json.dumps({"TABLE_interface": {"ROW_interface": rows}}, indent=2)
+
+
+def generate_junos(interfaces: int, seed: int = 0) -> str:
+    """`show interfaces | display xml` output, one logical unit per port, trailing CLI prompt included."""
+    rng = random.Random(seed)
+    parts = [
+        '<rpc-reply xmlns:junos="http://xml.juniper.net/junos/21.4R0/junos">',
+        '    <interface-information xmlns="http://xml.juniper.net/junos/21.4R0/junos-interface" junos:style="normal">',
+    ]
+    for i in range(interfaces):
+        name = f"ge-{i // 2304}/{i // 48 % 48}/{i % 48}"
+        description = _description(rng, i)
+        description_xml = f"            <description>{escape(description)}</description>\n" if description else ""
+        parts.append(
+            "        <physical-interface>\n"
+            f"            <name>\n{name}\n</name>\n"
+            '            <admin-status junos:format="Enabled">up</admin-status>\n'
+            f"            <oper-status>\n{rng.choice(['up', 'down'])}\n</oper-status>\n"
+            f"{description_xml}"
+            "            <local-index>\n150\n</local-index>\n"
+            "            <snmp-index>\n526\n</snmp-index>\n"
+            "            <link-level-type>\nEthernet\n</link-level-type>\n"
+            "            <mtu>\n1514\n</mtu>\n"
+            "            <speed>\n1000mbps\n</speed>\n"
+            "            <current-physical-address>\n"
+            f"00:a1:{i % 256:02x}:00:00:01\n"
+            "</current-physical-address>\n"
+            "            <traffic-statistics junos:style=\"brief\">\n"
+            f"                <input-bps>\n{rng.randrange(10 ** 9)}\n</input-bps>\n"
+            f"                <input-pps>\n{rng.randrange(10 ** 6)}\n</input-pps>\n"
+            f"                <output-bps>\n{rng.randrange(10 ** 9)}\n</output-bps>\n"
+            f"                <output-pps>\n{rng.randrange(10 ** 6)}\n</output-pps>\n"
+            "            </traffic-statistics>\n"
+            "            <logical-interface>\n"
+            f"                <name>\n{name}.0\n</name>\n"
+            "                <description>unit 0</description>\n"
+            "                <address-family>\n"
+            "                    <address-family-name>\neth-switch\n</address-family-name>\n"
+            "                </address-family>\n"
+            "            </logical-interface>\n"
+            "        </physical-interface>"
+        )
+    parts += ["    </interface-information>", "    <cli>", "        <banner>{master:0}</banner>", "    </cli>", "</rpc-reply>", "", "{master:0}"]
+    return "\n".join(parts)
+
+
+GENERATORS: Dict[str, Callable[[int], str]] = {
+    "ios": generate_ios,
+    "nxos": generate_nxos,
+    "junos": generate_junos,
+}
+
+
+# ── tree-building baselines (what the job did before) ─────────
+
+def tree_ios(output: str) -> Dict[str, str]:
+    interfaces = {}
+    current_intf = None
+    for line in output.splitlines():
+        if line and not line[0].isspace() and " is " in line:
+            current_intf = line.split()[0]
+            interfaces[current_intf] = ""
+        elif current_intf and "Description:" in line:
+            interfaces[current_intf] = line.split("Description:")[-1].strip()
+    return interfaces
+
+
+def tree_nxos(output: str) -> Dict[str, str]:
+    rows = json.loads(output)["TABLE_interface"]["ROW_interface"]
+    return {row["interface"]: row.get("desc", "") for row in rows}
+
+
+def tree_junos(output: str) -> Dict[str, str]:
+    xml = output[:output.rfind(">") + 1]
+    if xmltodict is not None:
+        reply = xmltodict.parse(xml)["rpc-reply"]["interface-information"]["physical-interface"]
+        return {intf["name"].strip(): (intf.get("description") or "").strip() for intf in reply}
+    root = ET.fromstring(xml)
+    interfaces = {}
+    for intf in root.iter("{http://xml.juniper.net/junos/21.4R0/junos-interface}physical-interface"):
+        children = {child.tag.rsplit("}", 1)[-1]: (child.text or "").strip() for child in intf}
+        interfaces[children["name"]] = children.get("description", "")
+    return interfaces
+
+
+BASELINES: Dict[str, Callable[[str], Dict[str, str]]] = {
+    "ios": tree_ios,
+    "nxos": tree_nxos,
+    "junos": tree_junos,
+}
+
+
+# ── measurement ───────────────────────────────────────────────
+
+def measure(parse: Callable[[str], Dict[str, str]], output: str, repeat: int) -> dict:
+    """Best wall time over `repeat` runs, then peak traced memory of one more run."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = parse(output)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = parse(output)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_mb": round(peak / 2 ** 20, 2), "interfaces": len(result), "result": result}
+
+
+def load_corpus(args) -> Dict[str, str]:
+    """Captured outputs from --corpus DIR (<slug>.txt), otherwise generated ones."""
+    corpus = {}
+    for slug in args.platforms:
+        path = os.path.join(args.corpus, f"{slug}.txt") if args.corpus else None
+        if path and os.path.exists(path):
+            with open(path) as f:
+                corpus[slug] = f.read()
+        else:
+            corpus[slug] = GENERATORS[slug](args.interfaces)
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--interfaces", type=int, default=10000, help="Interfaces per generated output")
+    parser.add_argument("--platforms", nargs="+", default=list(GENERATORS), choices=list(PARSERS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", help="Directory of captured outputs named <platform>.txt")
+    parser.add_argument("--write-corpus", help="Write the generated outputs to this directory and exit")
+    parser.add_argument("--output", help="Write all results as JSON to this file")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args)
+    if args.write_corpus:
+        os.makedirs(args.write_corpus, exist_ok=True)
+        for slug, output in corpus.items():
+            with open(os.path.join(args.write_corpus, f"{slug}.txt"), "w") as f:
+                f.write(output)
+        return
+
+    rows: List[dict] = []
+    print(f"{'platform':<14}{'parser':<11}{'MB in':>8}{'ifaces':>8}{'seconds':>10}{'peak MB':>10}")
+    for slug, output in corpus.items():
+        streaming = measure(lambda text: parse_interfaces(slug, text), output, args.repeat)
+        baseline = measure(BASELINES[slug], output, args.repeat)
+        if streaming.pop("result") != baseline.pop("result"):
+            print(f"WARNING: streaming and tree parsers disagree on {slug}")
+        size_mb = len(output) / 2 ** 20
+        for name, row in (("streaming", streaming), ("tree", baseline)):
+            rows.append({"platform": slug, "parser": name, "input_mb": round(size_mb, 2), **row})
+            print(f"{slug:<14}{name:<11}{size_mb:>8.1f}{row['interfaces']:>8}{row['seconds']:>10.4f}{row['peak_mb']:>10.2f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Nornir inventory plugin that bulk-prefetches Nautobot GraphQL data for every host."""
+
+import json
+import logging
+import ipaddress
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Union
+
+from nornir.core.inventory import Defaults, Groups, Host, Hosts, Inventory
+from nornir.core.plugins.inventory import InventoryPluginRegister
+from nornir_nautobot.plugins.inventory.nautobot import NautobotInventory
+
+logger = logging.getLogger(__name__)
+
+# Only the fields Nornir needs to build a host; `{filters}` takes the rendered filter_parameters
+INVENTORY_QUERY = """
+query ($limit: Int, $offset: Int) {
+  devices(limit: $limit, offset: $offset{filters}) {
+    id
+    name
+    platform {
+      network_driver
+    }
+    primary_ip4 {
+      address
+    }
+    primary_ip6 {
+      address
+    }
+  }
+}
+"""
+
+
+def render_filters(filter_parameters: Optional[Dict[str, Any]]) -> str:
+    """REST-style filter parameters as GraphQL arguments, e.g. {"status": "active"} -> ', status: "active"'."""
+    # JSON strings, numbers, booleans and lists are also valid GraphQL literals
+    return "".join(f", {key}: {json.dumps(value)}" for key, value in (filter_parameters or {}).items())
+
+
+class LazyHostData(dict):
+    """Host data whose "graphql" entry is fetched, for its whole batch, the first time it is read."""
+
+    def __init__(self, data: Dict[str, Any], batch: "LazyBatch"):
+        super().__init__(data)
+        self._batch = batch
+
+    def _load(self, key) -> None:
+        if key == "graphql" and not super().__contains__(key):
+            self._batch.load()
+
+    def __getitem__(self, key):
+        self._load(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key) -> bool:
+        self._load(key)
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        self._load(key)
+        return super().get(key, default)
+
+
+class LazyBatch:
+    """One batch of hosts whose GraphQL data is fetched with a single query on first use."""
+
+    def __init__(self, inventory: "PrefetchNautobotInventory", hosts: List[Host]):
+        self.inventory = inventory
+        self.hosts = hosts
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        # Runner threads reading hosts of the same batch wait for one query
+        with self.lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            try:
+                devices = self.inventory._query_batch([host.name for host in self.hosts])
+            except Exception as e:
+                logger.error(f"GraphQL prefetch failed for {len(self.hosts)} hosts: {str(e)}")
+                return
+            by_name = {host.name: host for host in self.hosts}
+            for device in devices:
+                host = by_name.get(device["name"])
+                if host is not None:
+                    dict.__setitem__(host.data, "graphql", device)
+
+
+class PrefetchNautobotInventory(NautobotInventory):
+    """
+    NautobotInventory that runs `graphql_query` for all hosts at load time.
+
+    The query must take a `$device_names: [String!]` variable and return a
+    `devices` list with `name`. Hosts are queried in batches of `batch_size`
+    on `workers` threads, and each device dict is stored in
+    `host.data["graphql"]`, so tasks read it locally instead of issuing one
+    query per host.
+
+    With `page_size`, hosts are built from paged GraphQL queries fetched on
+    `workers` threads, asking only for name, platform driver and primary
+    IPs, instead of one serial walk of the full REST device list. Hosts
+    then carry `data["nautobot"]` (the GraphQL record) rather than a
+    pynautobot object. With `lazy`, the `graphql_query` prefetch is
+    deferred: a batch is queried the first time a task reads
+    `host.data["graphql"]` for any of its hosts, so runs on a filtered
+    subset only pay for the batches they touch and the first tasks start
+    as soon as the host list is loaded.
+    """
+
+    def __init__(
+        self,
+        nautobot_url: Union[str, None],
+        nautobot_token: Union[str, None],
+        graphql_query: Optional[str] = None,
+        ssl_verify: Union[bool, None] = True,
+        filter_parameters: Union[Dict[str, Any], None] = None,
+        pynautobot_dict: Union[bool, None] = True,
+        enable_threading: Union[bool, None] = False,
+        batch_size: int = 500,
+        workers: int = 4,
+        page_size: int = 0,
+        lazy: bool = False,
+    ) -> None:
+        super().__init__(
+            nautobot_url=nautobot_url,
+            nautobot_token=nautobot_token,
+            ssl_verify=ssl_verify,
+            filter_parameters=filter_parameters,
+            pynautobot_dict=pynautobot_dict,
+            enable_threading=enable_threading,
+        )
+        self.graphql_query = graphql_query
+        self.batch_size = batch_size
+        self.workers = workers
+        self.page_size = page_size
+        self.lazy = lazy
+
+    def _query_batch(self, device_names: List[str]) -> List[Dict[str, Any]]:
+        response = self.pynautobot_obj.graphql.query(
+            query=self.graphql_query,
+            variables={"device_names": device_names},
+        )
+        return (response.json.get("data") or {}).get("devices") or []
+
+    def _query_page(self, query: str, offset: int) -> List[Dict[str, Any]]:
+        response = self.pynautobot_obj.graphql.query(
+            query=query,
+            variables={"limit": self.page_size, "offset": offset},
+        )
+        if response.json.get("errors"):
+            raise RuntimeError(f"GraphQL errors at offset {offset}: {response.json['errors']}")
+        return (response.json.get("data") or {}).get("devices") or []
+
+    def _host(self, device: Dict[str, Any], defaults: Defaults) -> Host:
+        # Same hostname rule as NautobotInventory: primary IPv4, then IPv6, then the name
+        if device.get("primary_ip4"):
+            hostname = str(ipaddress.ip_interface(device["primary_ip4"]["address"]).ip)
+        elif device.get("primary_ip6"):
+            hostname = str(ipaddress.ip_interface(device["primary_ip6"]["address"]).ip)
+        else:
+            hostname = device["name"]
+
+        data = {"nautobot": device}
+        if self.pynautobot_dict:
+            data["pynautobot_dictionary"] = device
+        return Host(
+            name=device["name"] or device["id"],
+            hostname=hostname,
+            platform=(device.get("platform") or {}).get("network_driver"),
+            data=data,
+            groups=[],
+            defaults=defaults,
+        )
+
+    def load_pages(self) -> Inventory:
+        """Build the inventory from `page_size` GraphQL pages fetched concurrently."""
+        # One cheap REST call (limit=1) for the total, so every page can be requested at once
+        if self.filter_parameters:
+            count = self.pynautobot_obj.dcim.devices.count(**self.filter_parameters)
+        else:
+            count = self.pynautobot_obj.dcim.devices.count()
+        query = INVENTORY_QUERY.replace("{filters}", render_filters(self.filter_parameters))
+        offsets = list(range(0, count, self.page_size))
+
+        hosts = Hosts()
+        defaults = Defaults()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # map() keeps page order, so hosts come out in Nautobot's ordering
+            for devices in pool.map(lambda offset: self._query_page(query, offset), offsets):
+                for device in devices:
+                    host = self._host(device, defaults)
+                    hosts[host.name] = host
+
+        logger.info(f"Loaded {len(hosts)}/{count} hosts in {len(offsets)} pages of {self.page_size}")
+        return Inventory(hosts=hosts, groups=Groups(), defaults=defaults)
+
+    def load(self) -> Inventory:
+        inventory = self.load_pages() if self.page_size else super().load()
+        if not self.graphql_query:
+            return inventory
+
+        names = list(inventory.hosts.keys())
+        batches = [names[i:i + self.batch_size] for i in range(0, len(names), self.batch_size)]
+
+        if self.lazy:
+            for batch in batches:
+                lazy_batch = LazyBatch(self, [inventory.hosts[name] for name in batch])
+                for name in batch:
+                    host = inventory.hosts[name]
+                    host.data = LazyHostData(host.data, lazy_batch)
+            logger.info(f"Deferred GraphQL data for {len(names)} hosts to first use ({len(batches)} batches)")
+            return inventory
+
+        fetched = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for batch, future in [(batch, pool.submit(self._query_batch, batch)) for batch in batches]:
+                try:
+                    devices = future.result()
+                except Exception as e:
+                    logger.error(f"GraphQL prefetch failed for {len(batch)} hosts: {str(e)}")
+                    continue
+                for device in devices:
+                    host = inventory.hosts.get(device["name"])
+                    if host is not None:
+                        host.data["graphql"] = device
+                        fetched += 1
+
+        logger.info(f"Prefetched GraphQL data for {fetched}/{len(names)} hosts in {len(batches)} queries")
+        return inventory
+
+
+InventoryPluginRegister.register("PrefetchNautobotInventory", PrefetchNautobotInventory)
@@ -0,0 +1,204 @@
+"""Incremental decoding of GraphQL `devices` responses into compact device records."""
+
+import re
+import sys
+import json
+import codecs
+from typing import Any, AsyncIterable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Start of the devices array, wherever it sits in the response
+DEVICES_START = re.compile(r'"devices"\s*:\s*\[')
+SEPARATORS = re.compile(r'[\s,]*')
+DECODER = json.JSONDecoder()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    # Site, platform and peer names repeat across thousands of devices
+    return sys.intern(value) if value is not None else None
+
+
+class DeviceRecord:
+    """
+    Compact, slot-based view of one GraphQL device.
+
+    Interfaces are stored column-wise as parallel tuples instead of a list of
+    nested dicts; `to_dict()` rebuilds the GraphQL shape when a caller needs
+    it for a single device.
+    """
+
+    __slots__ = (
+        "name",
+        "site",
+        "platform",
+        "primary_ip",
+        "interface_names",
+        "interface_descriptions",
+        "interface_ips",
+        "peer_devices",
+        "peer_interfaces",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        site: Optional[str],
+        platform: Optional[str],
+        primary_ip: Optional[str],
+        interface_names: Tuple[str, ...],
+        interface_descriptions: Tuple[Optional[str], ...],
+        interface_ips: Tuple[Tuple[str, ...], ...],
+        peer_devices: Tuple[Optional[str], ...],
+        peer_interfaces: Tuple[Optional[str], ...],
+    ):
+        self.name = name
+        self.site = site
+        self.platform = platform
+        self.primary_ip = primary_ip
+        self.interface_names = interface_names
+        self.interface_descriptions = interface_descriptions
+        self.interface_ips = interface_ips
+        self.peer_devices = peer_devices
+        self.peer_interfaces = peer_interfaces
+
+    @classmethod
+    def from_graphql(cls, device: Dict[str, Any]) -> "DeviceRecord":
+        interfaces = device.get("interfaces") or []
+        peers = [iface.get("connected_endpoint") or {} for iface in interfaces]
+        return cls(
+            name=device["name"],
+            site=_intern((device.get("site") or {}).get("name")),
+            platform=_intern((device.get("platform") or {}).get("name")),
+            primary_ip=(device.get("primary_ip4") or {}).get("address"),
+            interface_names=tuple(_intern(iface["name"]) for iface in interfaces),
+            interface_descriptions=tuple(iface.get("description") or None for iface in interfaces),
+            interface_ips=tuple(
+                tuple(ip["address"] for ip in iface.get("ip_addresses") or []) for iface in interfaces
+            ),
+            peer_devices=tuple(_intern((peer.get("device") or {}).get("name")) for peer in peers),
+            peer_interfaces=tuple(_intern(peer.get("name")) for peer in peers),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rebuild the GraphQL dict shape for this device."""
+        interfaces = []
+        for name, description, ips, peer_device, peer_name in zip(
+            self.interface_names,
+            self.interface_descriptions,
+            self.interface_ips,
+            self.peer_devices,
+            self.peer_interfaces,
+        ):
+            interfaces.append({
+                "name": name,
+                "description": description or "",
+                "ip_addresses": [{"address": ip} for ip in ips],
+                "connected_endpoint": (
+                    {"__typename": "InterfaceType", "device": {"name": peer_device}, "name": peer_name}
+                    if peer_device else None
+                ),
+            })
+        return {
+            "name": self.name,
+            "site": {"name": self.site} if self.site else None,
+            "platform": {"name": self.platform} if self.platform else None,
+            "primary_ip4": {"address": self.primary_ip} if self.primary_ip else None,
+            "interfaces": interfaces,
+        }
+
+    def __repr__(self) -> str:
+        return f"DeviceRecord(name={self.name!r}, interfaces={len(self.interface_names)})"
+
+
+class DevicesStreamDecoder:
+    """
+    Push-style decoder for the `devices` array of a GraphQL response.
+
+    Feed it raw byte chunks as they arrive and call `close()` at the end of
+    the response; each complete device object is
+    decoded on its own with `raw_decode`, so the full response is never held
+    as a tree. A device split across chunks is retried only once the pending
+    text has doubled, which keeps decoding linear even for devices larger
+    than a chunk. Text before the array is kept only until the array starts,
+    which is enough to report GraphQL `errors` when no data comes back.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._retry_at = 0      # Pending length needed before retrying a partial device
+        self.started = False    # Saw the start of the devices array
+        self.finished = False   # Saw the end of the devices array
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """Consume a chunk and return every device completed by it."""
+        self._buffer += self._text.decode(chunk)
+        devices = []
+
+        if not self.started:
+            match = DEVICES_START.search(self._buffer)
+            if match is None:
+                return devices
+            self._buffer = self._buffer[match.end():]
+            self.started = True
+
+        # Work on offsets and trim the buffer once per chunk, not once per device
+        buffer = self._buffer
+        start = 0
+        while not self.finished:
+            # Skip separators until the next object or the array end
+            start = SEPARATORS.match(buffer, start).end()
+            if start == len(buffer):
+                break
+            if buffer[start] == "]":
+                self.finished = True
+                start = len(buffer)
+                break
+            if len(buffer) - start < self._retry_at:
+                break
+
+            try:
+                device, end = DECODER.raw_decode(buffer, start)
+            except ValueError:
+                # Incomplete object: wait for more text before trying again
+                self._retry_at = 2 * (len(buffer) - start)
+                break
+            self._retry_at = 0
+            devices.append(device)
+            start = end
+
+        self._buffer = buffer[start:]
+        return devices
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Signal the end of the response and return any device still pending."""
+        self._retry_at = 0
+        return self.feed(b"")
+
+    def errors(self) -> Any:
+        """GraphQL errors from the response, if the devices array never started."""
+        if self.started:
+            return None
+        try:
+            return json.loads(self._buffer).get("errors", "Unknown error")
+        except ValueError:
+            return "Unknown error"
+
+
+def iter_records(chunks: Iterable[bytes]) -> Iterator[DeviceRecord]:
+    """Decode compact device records from a synchronous chunk iterator (e.g. requests' iter_content)."""
+    decoder = DevicesStreamDecoder()
+    for chunk in chunks:
+        for device in decoder.feed(chunk):
+            yield DeviceRecord.from_graphql(device)
+    for device in decoder.close():
+        yield DeviceRecord.from_graphql(device)
+
+
+async def aiter_records(chunks: AsyncIterable[bytes], decoder: Optional[DevicesStreamDecoder] = None):
+    """Decode compact device records from an async chunk iterator (e.g. aiohttp's iter_chunked)."""
+    decoder = decoder or DevicesStreamDecoder()
+    async for chunk in chunks:
+        for device in decoder.feed(chunk):
+            yield DeviceRecord.from_graphql(device)
+    for device in decoder.close():
+        yield DeviceRecord.from_graphql(device)
@@ -0,0 +1,212 @@
+"""Local stand-in for Nautobot's GraphQL and REST device APIs, serving a synthetic inventory."""
+
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from typing import Dict, List
+
+from aiohttp import web
+
+logger = logging.getLogger("nautobot-stub")
+
+PLATFORMS = [("ios", "cisco_ios"), ("nxos", "cisco_nxos"), ("junos", "juniper_junos")]
+
+
+def device_name(index: int) -> str:
+    return f"dev-{index:05d}"
+
+
+class StubNautobot:
+    """
+    Synthetic inventory of `devices` devices with `interfaces` interfaces each.
+
+    Interface 0 and 1 of every device link to the next and previous device in
+    a ring. Each request waits `latency + per_device * devices returned`
+    seconds and fails with a 503 with probability `error_rate`. Request
+    counts and per-query service times are exposed on `/_stats`.
+    """
+
+    def __init__(self, devices: int, interfaces: int = 8, latency: float = 0.02,
+                 per_device: float = 0.0005, error_rate: float = 0.0, seed: int = 0):
+        self.count = devices
+        self.latency = latency
+        self.per_device = per_device
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+        # Pre-render every device once so response time is spent in the injected latency
+        self.index = {device_name(i): i for i in range(devices)}
+        self.graphql_json: List[str] = [json.dumps(self._graphql_device(i, interfaces)) for i in range(devices)]
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests: Dict[str, int] = {"graphql": 0, "rest": 0, "errors": 0}
+        self.latencies: List[float] = []
+        self.bytes_out = 0
+
+    def _graphql_device(self, i: int, interfaces: int) -> dict:
+        platform, _ = PLATFORMS[i % len(PLATFORMS)]
+        ifaces = []
+        for j in range(interfaces):
+            peer = None
+            if j == 0:
+                peer = {"__typename": "InterfaceType", "device": {"name": device_name((i + 1) % self.count)}, "name": "Gi1/0/1"}
+            elif j == 1:
+                peer = {"__typename": "InterfaceType", "device": {"name": device_name((i - 1) % self.count)}, "name": "Gi1/0/0"}
+            ifaces.append({
+                "name": f"Gi1/0/{j}",
+                "description": f"uplink {j}" if j < 2 else "",
+                "ip_addresses": [{"address": f"10.{i // 256 % 256}.{i % 256}.{j}/31"}] if j < 2 else [],
+                "connected_endpoint": peer,
+            })
+        return {
+            "name": device_name(i),
+            "site": {"name": f"site-{i % 100:02d}"},
+            "platform": {"name": platform},
+            "primary_ip4": {"address": f"172.{16 + i // 65536 % 16}.{i // 256 % 256}.{i % 256}/32"},
+            "interfaces": ifaces,
+        }
+
+    def _inventory_device(self, i: int) -> dict:
+        _, driver = PLATFORMS[i % len(PLATFORMS)]
+        return {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "name": device_name(i),
+            "platform": {"network_driver": driver},
+            "primary_ip4": {"address": f"172.{16 + i // 65536 % 16}.{i // 256 % 256}.{i % 256}/32"},
+            "primary_ip6": None,
+        }
+
+    def _rest_device(self, i: int) -> dict:
+        platform, driver = PLATFORMS[i % len(PLATFORMS)]
+        return {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "name": device_name(i),
+            "url": f"/api/dcim/devices/{i}/",
+            "status": {"value": "active", "label": "Active"},
+            "platform": {"name": platform, "network_driver": driver},
+            "primary_ip4": {"address": f"172.{16 + i // 65536 % 16}.{i // 256 % 256}.{i % 256}/32"},
+            "primary_ip6": None,
+        }
+
+    async def _delay(self, devices: int) -> bool:
+        """Sleep for the modeled service time; return False if this request should fail."""
+        await asyncio.sleep(self.latency + self.per_device * devices)
+        return self.random.random() >= self.error_rate
+
+    def _select(self, variables: dict) -> List[int]:
+        if "device_names" in variables:
+            return [self.index[name] for name in variables["device_names"] if name in self.index]
+        if "device_name" in variables:
+            return [self.index[variables["device_name"]]] if variables["device_name"] in self.index else []
+        if "limit" in variables:
+            offset = variables.get("offset") or 0
+            return list(range(offset, min(self.count, offset + variables["limit"])))
+        return list(range(self.count))
+
+    async def graphql(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        self.requests["graphql"] += 1
+        body = await request.json()
+        selected = self._select(body.get("variables") or {})
+
+        if not await self._delay(len(selected)):
+            self.requests["errors"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        # Names-only queries (e.g. reconciliation listings) get names only
+        if re.search(r"devices\([^)]*\)\s*{\s*name\s*}", body.get("query", "")):
+            devices = ",".join(json.dumps({"name": device_name(i)}) for i in selected)
+        # Inventory page queries (nautobot_prefetch_inventory) get host-building fields only
+        elif "network_driver" in body.get("query", ""):
+            devices = ",".join(json.dumps(self._inventory_device(i)) for i in selected)
+        else:
+            devices = ",".join(self.graphql_json[i] for i in selected)
+        text = '{"data":{"devices":[' + devices + "]}}"
+
+        self.bytes_out += len(text)
+        self.latencies.append(time.perf_counter() - started)
+        return web.Response(text=text, content_type="application/json")
+
+    async def devices(self, request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        self.requests["rest"] += 1
+        limit = int(request.query.get("limit", 50)) or 1000
+        limit = min(limit, 1000)
+        offset = int(request.query.get("offset", 0))
+        selected = range(offset, min(self.count, offset + limit))
+
+        if not await self._delay(len(selected)):
+            self.requests["errors"] += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        next_url = None
+        if offset + limit < self.count:
+            next_url = str(request.url.update_query({"limit": limit, "offset": offset + limit}))
+        payload = {
+            "count": self.count,
+            "next": next_url,
+            "previous": None,
+            "results": [self._rest_device(i) for i in selected],
+        }
+        text = json.dumps(payload)
+        self.bytes_out += len(text)
+        self.latencies.append(time.perf_counter() - started)
+        return web.Response(text=text, content_type="application/json")
+
+    async def stats(self, request: web.Request) -> web.Response:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+        return web.json_response({
+            **self.requests,
+            "bytes_out": self.bytes_out,
+            "p50_ms": round(percentile(0.50) * 1000, 2),
+            "p99_ms": round(percentile(0.99) * 1000, 2),
+        })
+
+    async def reset_stats(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({"ok": True})
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/graphql/", self.graphql)
+        app.router.add_post("/api/graphql/", self.graphql)
+        app.router.add_get("/api/dcim/devices/", self.devices)
+        app.router.add_get("/_stats", self.stats)
+        app.router.add_post("/_reset", self.reset_stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--interfaces", type=int, default=8, help="Interfaces per device")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Base latency per request")
+    parser.add_argument("--per-device-ms", type=float, default=0.5, help="Extra latency per device returned")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    stub = StubNautobot(
+        devices=args.devices,
+        interfaces=args.interfaces,
+        latency=args.latency_ms / 1000,
+        per_device=args.per_device_ms / 1000,
+        error_rate=args.error_rate,
+    )
+    logger.info(f"Serving {args.devices} synthetic devices on http://{args.host}:{args.port}")
+    web.run_app(stub.app(), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""In-memory, array-backed network topology built from Nautobot `connected_endpoint` data."""
+
+import sys
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from nautobot_stream_decode import DeviceRecord
+
+
+def _links(device: Any) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """Yield (interface, peer device, peer interface) from a GraphQL device dict or DeviceRecord."""
+    if isinstance(device, DeviceRecord):
+        yield from zip(device.interface_names, device.peer_devices, device.peer_interfaces)
+        return
+    for iface in device.get("interfaces") or []:
+        peer = iface.get("connected_endpoint") or {}
+        yield iface["name"], (peer.get("device") or {}).get("name"), peer.get("name")
+
+
+class TopologyGraph:
+    """
+    Device/interface graph with integer-interned IDs and CSR adjacency.
+
+    Every device and interface gets a dense integer ID. Links are stored per
+    interface in `iface_peer` (the peer interface ID, or -1), and each
+    device's interfaces sit in one CSR block (`_offsets`/`_ifaces`), so a
+    neighbor lookup is a slice plus two array reads. `update()` applies a
+    refreshed batch of devices in place: changed devices keep their
+    interface list in a small overlay until it outgrows
+    `compact_ratio` of the graph, at which point `compact()` folds it back
+    into the CSR arrays.
+    """
+
+    def __init__(self, compact_ratio: float = 0.05):
+        self.compact_ratio = compact_ratio
+
+        self.device_ids: Dict[str, int] = {}
+        self.device_names: List[str] = []
+        self._iface_index: List[Dict[str, int]] = []  # Per device: interface name -> interface ID
+
+        self.iface_names: List[str] = []
+        self.iface_device = array("l")  # Interface ID -> device ID
+        self.iface_peer = array("l")    # Interface ID -> peer interface ID, or -1
+
+        # CSR: interfaces of device d are _ifaces[_offsets[d]:_offsets[d + 1]]
+        self._offsets = array("l", [0])
+        self._ifaces = array("l")
+        # Device ID -> interface IDs for devices changed since the last compact()
+        self._overlay: Dict[int, array] = {}
+
+    # ── interning ─────────────────────────────────────────────
+
+    def _device_id(self, name: str) -> int:
+        device_id = self.device_ids.get(name)
+        if device_id is None:
+            device_id = len(self.device_names)
+            self.device_ids[name] = device_id
+            self.device_names.append(sys.intern(name))
+            self._iface_index.append({})
+            self._overlay[device_id] = array("l")
+        return device_id
+
+    def _iface_id(self, device_id: int, name: str) -> int:
+        index = self._iface_index[device_id]
+        iface_id = index.get(name)
+        if iface_id is None:
+            iface_id = len(self.iface_names)
+            index[name] = iface_id
+            self.iface_names.append(sys.intern(name))
+            self.iface_device.append(device_id)
+            self.iface_peer.append(-1)
+            # New interface on a device we may not have refreshed: list it so links are visible both ways
+            self._device_ifaces_for_write(device_id).append(iface_id)
+        return iface_id
+
+    def _device_ifaces(self, device_id: int) -> array:
+        ifaces = self._overlay.get(device_id)
+        if ifaces is not None:
+            return ifaces
+        if device_id + 1 < len(self._offsets):
+            return self._ifaces[self._offsets[device_id]:self._offsets[device_id + 1]]
+        return array("l")
+
+    def _device_ifaces_for_write(self, device_id: int) -> array:
+        if device_id not in self._overlay:
+            self._overlay[device_id] = array("l", self._device_ifaces(device_id))
+        return self._overlay[device_id]
+
+    def _unlink(self, iface_id: int) -> None:
+        peer = self.iface_peer[iface_id]
+        if peer >= 0:
+            if self.iface_peer[peer] == iface_id:
+                self.iface_peer[peer] = -1
+            self.iface_peer[iface_id] = -1
+
+    # ── updates ───────────────────────────────────────────────
+
+    def update(self, devices: Iterable[Any]) -> None:
+        """Apply a refreshed batch of GraphQL devices (dicts or DeviceRecords) in place."""
+        for device in devices:
+            name = device.name if isinstance(device, DeviceRecord) else device["name"]
+            device_id = self._device_id(name)
+            current = []
+            for iface_name, peer_device, peer_iface in _links(device):
+                iface_id = self._iface_id(device_id, iface_name)
+                current.append(iface_id)
+                if peer_device and peer_iface:
+                    peer_id = self._iface_id(self._device_id(peer_device), peer_iface)
+                    if self.iface_peer[iface_id] != peer_id:
+                        self._unlink(iface_id)
+                        self._unlink(peer_id)
+                        self.iface_peer[iface_id] = peer_id
+                        self.iface_peer[peer_id] = iface_id
+                else:
+                    self._unlink(iface_id)
+
+            # Interfaces no longer reported by the device lose their links and membership
+            kept = set(current)
+            for iface_id in self._device_ifaces(device_id):
+                if iface_id not in kept:
+                    self._unlink(iface_id)
+                    del self._iface_index[device_id][self.iface_names[iface_id]]
+            self._overlay[device_id] = array("l", current)
+
+        if len(self._overlay) > self.compact_ratio * max(1, len(self.device_names)):
+            self.compact()
+
+    def remove_device(self, name: str) -> None:
+        """Drop all links and interfaces of a device deleted from Nautobot."""
+        device_id = self.device_ids.get(name)
+        if device_id is None:
+            return
+        for iface_id in self._device_ifaces(device_id):
+            self._unlink(iface_id)
+        self._iface_index[device_id].clear()
+        self._overlay[device_id] = array("l")
+
+    def compact(self) -> None:
+        """Fold the overlay back into the CSR arrays."""
+        offsets = array("l", [0])
+        ifaces = array("l")
+        for device_id in range(len(self.device_names)):
+            ifaces.extend(self._device_ifaces(device_id))
+            offsets.append(len(ifaces))
+        self._offsets, self._ifaces = offsets, ifaces
+        self._overlay = {}
+
+    # ── queries ───────────────────────────────────────────────
+
+    def _neighbor_ids(self, device_id: int) -> Iterator[int]:
+        iface_peer, iface_device = self.iface_peer, self.iface_device
+        for iface_id in self._device_ifaces(device_id):
+            peer = iface_peer[iface_id]
+            if peer >= 0:
+                yield iface_device[peer]
+
+    def _bfs(self, sources: Iterable[int], max_depth: int = -1, blocked: Set[int] = frozenset()) -> Dict[int, int]:
+        """Return device ID -> hop distance from `sources`, never entering `blocked`."""
+        depth = {source: 0 for source in sources if source not in blocked}
+        queue = deque(depth)
+        while queue:
+            device_id = queue.popleft()
+            hops = depth[device_id]
+            if hops == max_depth:
+                continue
+            for neighbor in self._neighbor_ids(device_id):
+                if neighbor not in depth and neighbor not in blocked:
+                    depth[neighbor] = hops + 1
+                    queue.append(neighbor)
+        return depth
+
+    def links(self, device: str) -> List[Tuple[str, str, str]]:
+        """(local interface, peer device, peer interface) for every connected interface."""
+        result = []
+        device_id = self.device_ids.get(device)
+        if device_id is None:
+            return result
+        for iface_id in self._device_ifaces(device_id):
+            peer = self.iface_peer[iface_id]
+            if peer >= 0:
+                result.append((
+                    self.iface_names[iface_id],
+                    self.device_names[self.iface_device[peer]],
+                    self.iface_names[peer],
+                ))
+        return result
+
+    def neighbors(self, device: str) -> Set[str]:
+        device_id = self.device_ids.get(device)
+        if device_id is None:
+            return set()
+        return {self.device_names[neighbor] for neighbor in self._neighbor_ids(device_id)}
+
+    def k_hop(self, device: str, k: int) -> Dict[str, int]:
+        """Devices within `k` hops of `device`, with their distance."""
+        device_id = self.device_ids.get(device)
+        if device_id is None:
+            return {}
+        return {self.device_names[d]: hops for d, hops in self._bfs([device_id], max_depth=k).items()}
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Fewest-hop device path from `source` to `target`, or None if unreachable."""
+        if source not in self.device_ids or target not in self.device_ids:
+            return None
+        start, goal = self.device_ids[source], self.device_ids[target]
+        parent = {start: -1}
+        queue = deque([start])
+        while queue:
+            device_id = queue.popleft()
+            if device_id == goal:
+                path = []
+                while device_id >= 0:
+                    path.append(self.device_names[device_id])
+                    device_id = parent[device_id]
+                return path[::-1]
+            for neighbor in self._neighbor_ids(device_id):
+                if neighbor not in parent:
+                    parent[neighbor] = device_id
+                    queue.append(neighbor)
+        return None
+
+    def blast_radius(self, failed: Iterable[str], roots: Iterable[str]) -> Set[str]:
+        """Devices that lose every path to `roots` when the `failed` devices go down."""
+        blocked = {self.device_ids[name] for name in failed if name in self.device_ids}
+        sources = [self.device_ids[name] for name in roots if name in self.device_ids]
+        before = self._bfs(sources)
+        after = self._bfs(sources, blocked=blocked)
+        return {self.device_names[d] for d in before if d not in after and d not in blocked}
+
+    def stats(self) -> Dict[str, int]:
+        links = sum(1 for peer in self.iface_peer if peer >= 0) // 2
+        return {"devices": len(self.device_names), "interfaces": len(self.iface_names), "links": links}
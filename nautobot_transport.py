@@ -0,0 +1,225 @@
+"""Shared aiohttp transport for Nautobot GraphQL clients, with per-query metrics."""
+
+import json
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence
+
+import aiohttp
+
+# Seconds; covers a fast cached query up to a slow bulk query
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Devices per query
+DEVICE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class Histogram:
+    """Fixed-bucket histogram in the Prometheus layout (cumulative `le` buckets, sum, count)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (the last finite bound for +Inf)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def to_dict(self) -> dict:
+        return {
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+            "inf": self.counts[-1],
+            "sum": round(self.sum, 6),
+            "count": self.count,
+            "p50": self.quantile(0.50),
+            "p99": self.quantile(0.99),
+        }
+
+    def prometheus_lines(self, name: str) -> List[str]:
+        lines = [f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum {self.sum:.6f}")
+        lines.append(f"{name}_count {self.count}")
+        return lines
+
+
+class QueryMetrics:
+    """
+    Counters and histograms for one run of GraphQL queries.
+
+    `ttfb` is the time until response headers arrive and `latency` the time
+    until the body is fully decoded, so their gap is transfer plus decode.
+    `bytes_in` counts decoded body bytes and `bytes_in_wire` the
+    Content-Length the server sent, which is smaller when the response was
+    compressed. Connection and DNS counters come from the session's trace
+    hooks and show whether keep-alive and the DNS cache are being used.
+    """
+
+    COUNTERS = (
+        "requests",
+        "failures",
+        "retries",
+        "bytes_out",
+        "bytes_in",
+        "bytes_in_wire",
+        "devices",
+        "connections_created",
+        "connections_reused",
+        "dns_cache_hits",
+        "dns_cache_misses",
+    )
+
+    def __init__(self):
+        self.started = time.time()
+        self.counters: Dict[str, int] = dict.fromkeys(self.COUNTERS, 0)
+        self.ttfb = Histogram(LATENCY_BUCKETS)
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.connect = Histogram(LATENCY_BUCKETS)
+        self.devices_per_query = Histogram(DEVICE_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+    def inc(self, counter: str, value: int = 1) -> None:
+        self.counters[counter] += value
+
+    def observe_query(self, ttfb: float, latency: float, status: int, bytes_out: int,
+                      bytes_in: int, bytes_in_wire: Optional[int], devices: int) -> None:
+        self.counters["requests"] += 1
+        self.counters["bytes_out"] += bytes_out
+        self.counters["bytes_in"] += bytes_in
+        self.counters["bytes_in_wire"] += bytes_in_wire if bytes_in_wire is not None else bytes_in
+        self.counters["devices"] += devices
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.ttfb.observe(ttfb)
+        self.latency.observe(latency)
+        self.devices_per_query.observe(devices)
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """Trace hooks that feed the connection and DNS counters of this object."""
+        trace = aiohttp.TraceConfig()
+
+        async def on_connection_create_start(session, context, params):
+            context.connect_started = time.perf_counter()
+
+        async def on_connection_create_end(session, context, params):
+            self.inc("connections_created")
+            self.connect.observe(time.perf_counter() - context.connect_started)
+
+        async def on_connection_reuseconn(session, context, params):
+            self.inc("connections_reused")
+
+        async def on_dns_cache_hit(session, context, params):
+            self.inc("dns_cache_hits")
+
+        async def on_dns_cache_miss(session, context, params):
+            self.inc("dns_cache_misses")
+
+        trace.on_connection_create_start.append(on_connection_create_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    def to_dict(self) -> dict:
+        return {
+            "elapsed_seconds": round(time.time() - self.started, 3),
+            **self.counters,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "ttfb_seconds": self.ttfb.to_dict(),
+            "latency_seconds": self.latency.to_dict(),
+            "connect_seconds": self.connect.to_dict(),
+            "devices_per_query": self.devices_per_query.to_dict(),
+        }
+
+    def to_prometheus(self, prefix: str = "nautobot_graphql") -> str:
+        lines = []
+        for counter, value in self.counters.items():
+            lines.append(f"# TYPE {prefix}_{counter}_total counter")
+            lines.append(f"{prefix}_{counter}_total {value}")
+        lines.append(f"# TYPE {prefix}_responses_total counter")
+        for status, count in sorted(self.statuses.items()):
+            lines.append(f'{prefix}_responses_total{{status="{status}"}} {count}')
+        lines += self.ttfb.prometheus_lines(f"{prefix}_ttfb_seconds")
+        lines += self.latency.prometheus_lines(f"{prefix}_latency_seconds")
+        lines += self.connect.prometheus_lines(f"{prefix}_connect_seconds")
+        lines += self.devices_per_query.prometheus_lines(f"{prefix}_devices_per_query")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, fmt: str = "json", path: Optional[str] = None) -> str:
+        """Render as "json" or "prometheus" text, writing it to `path` if given."""
+        text = self.to_prometheus() if fmt == "prometheus" else json.dumps(self.to_dict(), indent=2) + "\n"
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+
+def create_session(
+    token: str,
+    metrics: Optional[QueryMetrics] = None,
+    pool_limit: int = 100,
+    pool_limit_per_host: int = 20,
+    keepalive_timeout: float = 30.0,
+    dns_cache_ttl: int = 300,
+    total_timeout: float = 120.0,
+    connect_timeout: float = 10.0,
+    read_timeout: float = 60.0,
+    compress: bool = True,
+    ssl_verify: bool = True,
+) -> aiohttp.ClientSession:
+    """
+    Build a ClientSession tuned for many GraphQL POSTs to one Nautobot host.
+
+    The pool is capped per host so a wide fan-out queues on the client
+    instead of opening hundreds of sockets, idle connections are kept for
+    `keepalive_timeout` seconds for reuse by the next chunk, and resolved
+    addresses are cached for `dns_cache_ttl` seconds. Auth and content
+    headers are set once on the session rather than per request. Timeouts
+    are split by phase: `connect_timeout` for getting a pooled or new
+    connection, `read_timeout` between socket reads, and `total_timeout`
+    for the whole request.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=pool_limit,
+        limit_per_host=pool_limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        use_dns_cache=True,
+        ttl_dns_cache=dns_cache_ttl,
+        ssl=None if ssl_verify else False,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=total_timeout,
+        connect=connect_timeout,
+        sock_read=read_timeout,
+    )
+    headers = {
+        "Authorization": f"Token {token}",
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate" if compress else "identity",
+    }
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers=headers,
+        auto_decompress=True,
+        trace_configs=[metrics.trace_config()] if metrics is not None else None,
+    )
@@ -1,18 +1,59 @@
 """Nautobot Job to update interface descriptions with LLDP neighbor information."""
 
-from nautobot.apps.jobs import Job, MultiObjectVar, register_jobs
-from nautobot.dcim.models import Device, Interface
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from nautobot.apps.jobs import Job, MultiObjectVar, IntegerVar, ChoiceVar, register_jobs
+from nautobot.dcim.models import Device
 from nautobot.core.celery import register_jobs as celery_register_jobs
 from nautobot.extras.models import Status
 from napalm import get_network_driver
 from nautobot.utilities.exceptions import JobException
 from django.conf import settings
 
+from nautobot_async_collect import BACKEND_CHOICES, CollectTarget, collect
+from nautobot_interface_parsers import NAPALM_DRIVER_PLATFORMS, get_lldp_parser
+from nautobot_interface_sync import sync_interface_descriptions
+from nautobot_job_logging import LOG_MODE_CHOICES, JobLog
+from nautobot_job_sharding import run_sharded
+
 name = "LLDP Neighbor Updater"
 
+
+def collect_lldp_neighbors(napalm_driver, hostname, timeout, started, key):
+    """
+    Open a NAPALM session to one device and return its LLDP neighbors.
+
+    Runs in a worker thread, so it only takes plain connection parameters
+    and never touches the ORM. Records its start time in `started[key]` so
+    the job can tell how long the device has actually been running.
+    """
+    started[key] = time.monotonic()
+    driver = get_network_driver(napalm_driver)
+    napalm_device = driver(
+        hostname=hostname,
+        username=settings.NAPALM_USERNAME,
+        password=settings.NAPALM_PASSWORD,
+        timeout=timeout,
+        optional_args=settings.NAPALM_ARGS if hasattr(settings, 'NAPALM_ARGS') else {},
+    )
+    napalm_device.open()
+    try:
+        return napalm_device.get_lldp_neighbors()
+    finally:
+        napalm_device.close()
+
+
 class UpdateInterfaceDescriptionsWithLLDP(Job):
     """
     Nautobot Job to fetch LLDP neighbors from devices and update interface descriptions.
+
+    LLDP data is collected from up to `workers` devices at once; the job
+    thread is the only consumer and applies each result to the database as
+    it arrives. A device that fails, or is still running `timeout` seconds
+    after its session started, is logged and skipped without stopping the
+    others. The asyncio backend runs every session on one event loop instead
+    of one thread per device.
     """
     devices = MultiObjectVar(
         model=Device,
@@ -21,14 +62,69 @@ class UpdateInterfaceDescriptionsWithLLDP(Job):
         label="Devices",
         description="Select devices to update interface descriptions for."
     )
+    workers = IntegerVar(
+        default=20,
+        min_value=1,
+        max_value=100,
+        label="Parallel sessions",
+        description="Number of devices to collect LLDP neighbors from at the same time."
+    )
+    timeout = IntegerVar(
+        default=60,
+        min_value=5,
+        label="Device timeout",
+        description="Seconds to wait for a device to connect or answer a command."
+    )
+    backend = ChoiceVar(
+        choices=BACKEND_CHOICES,
+        default="threads",
+        label="Collection backend",
+        description="Threads run one NAPALM session per worker; asyncio runs every session on a single event loop."
+    )
+    max_sessions = IntegerVar(
+        default=500,
+        min_value=1,
+        max_value=5000,
+        label="Concurrent sessions (asyncio)",
+        description="Maximum SSH sessions open at once with the asyncio backend."
+    )
+    log_mode = ChoiceVar(
+        choices=LOG_MODE_CHOICES,
+        default="detailed",
+        label="Logging",
+        description="Summary logs one entry per device plus warnings and errors, and attaches every event as a JSON file."
+    )
+    shard_size = IntegerVar(
+        default=0,
+        min_value=0,
+        label="Shard size",
+        description="Split the selection into child jobs of this many devices, run in parallel across Celery workers. 0 runs everything in this job."
+    )
+    shard_timeout = IntegerVar(
+        default=3600,
+        min_value=60,
+        label="Shard timeout",
+        description="Seconds to wait for all child jobs of a sharded run; children still running then are revoked."
+    )
 
     class Meta:
         name = "Update Interface Descriptions with LLDP Neighbors"
         description = "Fetches LLDP neighbor information from selected devices using NAPALM and updates the interface descriptions in Nautobot."
         has_sensitive_variables = False
 
-    def run(self, devices):
+    def run(self, devices, workers=20, timeout=60, backend="threads", max_sessions=500, log_mode="detailed",
+            shard_size=0, shard_timeout=3600):
+        if shard_size and len(devices) > shard_size:
+            # Parent of a sharded run: fan out to child jobs and aggregate their results
+            return run_sharded(
+                self, devices, shard_size, shard_timeout, workers=workers, timeout=timeout,
+                backend=backend, max_sessions=max_sessions, log_mode=log_mode,
+            )
+
         active_status = Status.objects.get(name="Active")
+
+        # Resolve connection details here: worker threads must not query the ORM
+        targets = []
         for device in devices:
             if not device.primary_ip:
                 self.logger.warning(f"Device {device.name} has no primary IP. Skipping.")
@@ -36,44 +132,120 @@ class UpdateInterfaceDescriptionsWithLLDP(Job):
             if not device.platform or not device.platform.napalm_driver:
                 self.logger.warning(f"Device {device.name} has no NAPALM driver configured. Skipping.")
                 continue
+            targets.append((device, device.platform.napalm_driver, str(device.primary_ip.address.ip)))
 
-            driver = get_network_driver(device.platform.napalm_driver)
-            napalm_device = driver(
-                hostname=str(device.primary_ip.address.ip),
-                username=settings.NAPALM_USERNAME,
-                password=settings.NAPALM_PASSWORD,
-                optional_args=settings.NAPALM_ARGS if hasattr(settings, 'NAPALM_ARGS') else {},
-            )
+        log = JobLog(self.logger, summarize=log_mode == "summary")
+        if backend == "asyncio":
+            failed = self.update_with_asyncio(targets, active_status, max_sessions, timeout, log)
+        else:
+            failed = self.update_with_threads(targets, active_status, workers, timeout, log)
+        log.save(self, "lldp-descriptions-log.json")
 
-            try:
-                napalm_device.open()
-                lldp_neighbors = napalm_device.get_lldp_neighbors()
-                self.logger.info(f"Fetched LLDP neighbors for {device.name}: {len(lldp_neighbors)} interfaces with neighbors.")
+        if failed:
+            # Reported once every other device has been processed
+            raise JobException(f"Failed to update {len(failed)} of {len(targets)} devices: {', '.join(sorted(failed))}")
 
-                for local_intf, neighbors in lldp_neighbors.items():
-                    # Find the interface in Nautobot
+        # Returned as the job result; sharded parents aggregate these per shard
+        return {"devices": len(targets)}
+
+    def update_with_threads(self, targets, active_status, workers, timeout, log):
+        """Collect with one NAPALM session per worker thread and apply results as they arrive; returns failed device names."""
+        self.logger.info(f"Collecting LLDP neighbors from {len(targets)} devices with {workers} parallel sessions.")
+        failed = []
+        started = {}
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {
+                pool.submit(collect_lldp_neighbors, napalm_driver, hostname, timeout, started, device.pk): device
+                for device, napalm_driver, hostname in targets
+            }
+            pending = set(futures)
+
+            # Single consumer: results are written to the ORM one device at a time, in completion order
+            while pending:
+                done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    device = futures[future]
                     try:
-                        iface = Interface.objects.get(device=device, name=local_intf)
-                    except Interface.DoesNotExist:
-                        self.logger.warning(f"Interface {local_intf} not found on device {device.name}. Skipping.")
-                        continue
-
-                    # Assuming one neighbor per interface; take the first one
-                    if neighbors:
-                        neighbor = neighbors[0]
-                        description = f"Connected to {neighbor['hostname']} port {neighbor['port']}"
-                        iface.description = description
-                        iface.status = active_status  # Optional: set status to Active if needed
-                        iface.validated_save()
-                        self.logger.info(f"Updated description for {device.name} interface {local_intf}: {description}")
-                    else:
-                        self.logger.info(f"No neighbors for {device.name} interface {local_intf}. No update.")
+                        lldp_neighbors = future.result()
+                        log.info(f"Fetched LLDP neighbors for {device.name}: {len(lldp_neighbors)} interfaces with neighbors.", device)
+                        self.apply_lldp_neighbors(device, lldp_neighbors, active_status, log)
+                    except Exception as e:
+                        log.error(f"Error processing device {device.name}: {str(e)}", device)
+                        failed.append(device.name)
+
+                # Give up on devices whose session has outlived the timeout; their threads finish on their own
+                now = time.monotonic()
+                for future in [f for f in pending if now - started.get(futures[f].pk, now) > timeout]:
+                    device = futures[future]
+                    log.error(f"Error processing device {device.name}: timed out after {timeout} seconds", device)
+                    failed.append(device.name)
+                    pending.discard(future)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return failed
+
+    def update_with_asyncio(self, targets, active_status, max_sessions, timeout, log):
+        """
+        Collect LLDP neighbors over scrapli asyncio sessions on a single event loop, then apply them; returns failed device names.
 
+        The NAPALM driver picks the CLI command and a parser that returns
+        the same shape as get_lldp_neighbors(), so results go through the
+        same apply step as the NAPALM path.
+        """
+        failed = []
+        devices = {}
+        collect_targets = []
+        for device, napalm_driver, hostname in targets:
+            platform_slug = NAPALM_DRIVER_PLATFORMS.get(napalm_driver)
+            if platform_slug is None:
+                log.error(f"Error processing device {device.name}: NAPALM driver {napalm_driver} has no asyncio LLDP parser", device)
+                failed.append(device.name)
+                continue
+            command, _ = get_lldp_parser(platform_slug)
+            devices[device.name] = (device, platform_slug)
+            collect_targets.append(CollectTarget(device.name, hostname, platform_slug, [command]))
+
+        self.logger.info(f"Collecting LLDP neighbors from {len(collect_targets)} devices with up to {max_sessions} concurrent sessions (asyncio).")
+        try:
+            outputs, errors = collect(
+                collect_targets, settings.NAPALM_USERNAME, settings.NAPALM_PASSWORD,
+                max_sessions=max_sessions, timeout=timeout,
+            )
+        except RuntimeError as e:
+            raise JobException(str(e))
+
+        for device_name, error in sorted(errors.items()):
+            log.error(f"Error processing device {device_name}: {str(error)}", devices[device_name][0])
+            failed.append(device_name)
+
+        for device_name, output in outputs.items():
+            device, platform_slug = devices[device_name]
+            try:
+                _, parser = get_lldp_parser(platform_slug)
+                lldp_neighbors = parser(output[0])
+                log.info(f"Fetched LLDP neighbors for {device.name}: {len(lldp_neighbors)} interfaces with neighbors.", device)
+                self.apply_lldp_neighbors(device, lldp_neighbors, active_status, log)
             except Exception as e:
-                self.logger.error(f"Error processing device {device.name}: {str(e)}")
-                raise JobException(f"Failed to update for {device.name}: {str(e)}")
-            finally:
-                napalm_device.close()
+                log.error(f"Error processing device {device.name}: {str(e)}", device)
+                failed.append(device.name)
+        return failed
+
+    def apply_lldp_neighbors(self, device, lldp_neighbors, active_status, log):
+        descriptions = {}
+        for local_intf, neighbors in lldp_neighbors.items():
+            # Assuming one neighbor per interface; take the first one
+            if neighbors:
+                neighbor = neighbors[0]
+                descriptions[local_intf] = f"Connected to {neighbor['hostname']} port {neighbor['port']}"
+            else:
+                log.info(f"No neighbors for {device.name} interface {local_intf}. No update.", device)
+
+        # Diff against Nautobot in memory and write only the interfaces that changed
+        counts = sync_interface_descriptions(
+            device, descriptions, active_status, log.device(device), device.platform.napalm_driver
+        )
+        log.summary(device, counts)
 
 # Register the job
 register_jobs(UpdateInterfaceDescriptionsWithLLDP)
@@ -1,21 +1,54 @@
 """Nautobot Job to copy interface descriptions from Cisco IOS-XE, Cisco NX-OS, and Juniper devices to Nautobot using Nornir."""
 
-from nautobot.apps.jobs import Job, MultiObjectVar, register_jobs
-from nautobot.dcim.models import Device, Interface
+from nautobot.apps.jobs import Job, MultiObjectVar, IntegerVar, BooleanVar, ChoiceVar, register_jobs
+from nautobot.dcim.models import Device
 from nautobot.core.celery import register_jobs as celery_register_jobs
 from nautobot.extras.models import Status
 from nautobot.utilities.exceptions import JobException
 from django.conf import settings
-from nornir import InitNornir
+from nornir.core import Nornir
+from nornir.core.task import Task, Result
+from nornir.core.inventory import ConnectionOptions, Defaults, Group, Groups, Host, Hosts, Inventory
+from nornir.plugins.runners import ThreadedRunner
 from nornir_netmiko.tasks import netmiko_send_command
-from nornir.core.exceptions import NornirExecutionError
-from nornir.core.inventory import Host
-import xmltodict
-import json
 import time
 
+from nautobot_async_collect import BACKEND_CHOICES, collect_interface_outputs
+from nautobot_fingerprints import FingerprintStore, fingerprint, fingerprint_commands, fingerprint_marker, interfaces_last_updated
+from nautobot_interface_parsers import PARSERS, get_parser
+from nautobot_interface_sync import sync_interface_descriptions
+from nautobot_job_logging import LOG_MODE_CHOICES, JobLog
+from nautobot_job_sharding import run_sharded
+
 name = "Interface Description Copier"
 
+# Platform slug -> Netmiko device type; commands and parsers come from nautobot_interface_parsers
+NETMIKO_DEVICE_TYPES = {
+    'ios': "cisco_xe",
+    'nxos': "cisco_nxos",
+    'junos': "juniper_junos",
+}
+
+
+def collect_interfaces(task: Task) -> Result:
+    """Run the interface command for the host's platform on its (reused) Netmiko connection."""
+    command, _ = get_parser(task.host.platform)
+    result = task.run(task=netmiko_send_command, command_string=command)
+    return Result(host=task.host, result=result[0].result)
+
+
+def collect_fingerprint(task: Task) -> Result:
+    """
+    Run the cheap config-change and boot commands used to decide whether the host needs a full collection.
+
+    The result is the fingerprint marker, or None when the output is empty or an error.
+    """
+    outputs = [
+        task.run(task=netmiko_send_command, command_string=command)[0].result
+        for command in fingerprint_commands(task.host.platform)
+    ]
+    return Result(host=task.host, result=fingerprint_marker(task.host.platform, outputs))
+
 class CopyInterfaceDescriptions(Job):
     """
     Nautobot Job to fetch interface descriptions from Cisco IOS-XE, Cisco NX-OS, and Juniper devices using Nornir and copy them to Nautobot.
@@ -27,93 +60,180 @@ class CopyInterfaceDescriptions(Job):
         label="Devices",
         description="Select devices (Cisco IOS-XE, Cisco NX-OS, or Juniper Junos) to copy interface descriptions from."
     )
+    workers = IntegerVar(
+        default=20,
+        min_value=1,
+        max_value=100,
+        label="Parallel sessions",
+        description="Number of devices to collect interface descriptions from at the same time."
+    )
+    backend = ChoiceVar(
+        choices=BACKEND_CHOICES,
+        default="threads",
+        label="Collection backend",
+        description="Threads run one Netmiko session per worker; asyncio runs every session on a single event loop."
+    )
+    max_sessions = IntegerVar(
+        default=500,
+        min_value=1,
+        max_value=5000,
+        label="Concurrent sessions (asyncio)",
+        description="Maximum SSH sessions open at once with the asyncio backend."
+    )
+    timeout = IntegerVar(
+        default=60,
+        min_value=5,
+        label="Device timeout (asyncio)",
+        description="Seconds a device may take to connect and answer its commands with the asyncio backend."
+    )
+    incremental = BooleanVar(
+        default=False,
+        label="Incremental",
+        description="Skip devices whose configuration and Nautobot interfaces are unchanged since the last successful run."
+    )
+    log_mode = ChoiceVar(
+        choices=LOG_MODE_CHOICES,
+        default="detailed",
+        label="Logging",
+        description="Summary logs one entry per device plus warnings and errors, and attaches every event as a JSON file."
+    )
+    shard_size = IntegerVar(
+        default=0,
+        min_value=0,
+        label="Shard size",
+        description="Split the selection into child jobs of this many devices, run in parallel across Celery workers. 0 runs everything in this job."
+    )
+    shard_timeout = IntegerVar(
+        default=3600,
+        min_value=60,
+        label="Shard timeout",
+        description="Seconds to wait for all child jobs of a sharded run; children still running then are revoked."
+    )
 
     class Meta:
         name = "Copy Interface Descriptions from Devices"
         description = "Fetches interface descriptions from Cisco IOS-XE, Cisco NX-OS, and Juniper Junos devices using Nornir and copies them to Nautobot."
         has_sensitive_variables = False
 
-    def normalize_interface_name(self, name, platform_slug):
-        """Normalize interface names for consistency across Cisco IOS-XE, NX-OS, and Junos."""
-        name = name.strip().lower()
-        if platform_slug == 'ios':
-            # Cisco IOS-XE: Ensure names like 'GigabitEthernet0/1' are properly formatted
-            return name.replace('gigabitethernet', 'GigabitEthernet')
-        elif platform_slug == 'nxos':
-            # Cisco NX-OS: Ensure names like 'Ethernet1/1' are properly formatted
-            return name.replace('ethernet', 'Ethernet')
-        elif platform_slug == 'junos':
-            # Juniper Junos: Names like 'ge-0/0/0' typically need no change
-            return name
-        return name
-
-    def connect_with_retry(self, nr, host, retries=3, delay=5):
-        """Attempt to connect to the device with retries."""
-        for attempt in range(retries):
-            try:
-                nr.run(task=netmiko_send_command, command_string="show version")
-                return True
-            except NornirExecutionError as e:
-                self.logger.warning(f"Connection attempt {attempt + 1} failed for {host}: {str(e)}")
-                time.sleep(delay)
-        return False
-
-    def parse_ios_interfaces(self, output):
-        """Parse Cisco IOS-XE interface descriptions from show interfaces output."""
-        interfaces = {}
-        current_intf = None
-        for line in output.splitlines():
-            if " interface " in line.lower():
-                current_intf = line.split()[-1]
-            elif current_intf and "Description:" in line:
-                description = line.split("Description:")[-1].strip()
-                interfaces[current_intf] = {'description': description}
-        return interfaces
-
-    def parse_nxos_interfaces(self, output):
-        """Parse Cisco NX-OS interface descriptions from show interface | json."""
+    def collect_with_retry(self, nr, task=collect_interfaces, retries=3, delay=5):
+        """
+        Run `task` on every host in one parallel pass, then retry only the hosts that failed.
+
+        Returns (host name -> command output, host name -> last error).
+        """
+        outputs = {}
+        errors = {}
+        pending = nr
+        for attempt in range(1, retries + 1):
+            # on_failed: Nornir otherwise skips hosts that failed a previous run
+            results = pending.run(task=task, on_failed=True)
+            for host_name, multi_result in results.items():
+                if multi_result.failed:
+                    # Innermost failure (e.g. the Netmiko error rather than the subtask wrapper)
+                    errors[host_name] = next((r.exception for r in reversed(multi_result) if r.exception), multi_result.exception)
+                else:
+                    outputs[host_name] = multi_result[0].result
+                    errors.pop(host_name, None)
+
+            if not errors or attempt == retries:
+                break
+            self.logger.warning(f"Attempt {attempt} failed for {len(errors)} hosts: {', '.join(sorted(errors))}. Retrying.")
+            failed = set(errors)
+            pending = nr.filter(filter_func=lambda host: host.name in failed)
+            # Drop sessions that may be half-open before reconnecting
+            pending.close_connections(on_failed=True)
+            time.sleep(delay)
+        return outputs, errors
+
+    def skip_unchanged(self, nr, targets, store):
+        """
+        Fingerprint every host with its cheap commands and drop those unchanged since the last run.
+
+        Returns the Nornir subset still to collect and host name -> fingerprint
+        marker. Hosts that cannot be fingerprinted, including those whose
+        commands return empty or error output, are always collected.
+        """
+        updated = interfaces_last_updated(device.pk for device in targets.values())
+        checkable = nr.filter(filter_func=lambda host: bool(fingerprint_commands(host.platform)))
+        results, errors = self.collect_with_retry(checkable, task=collect_fingerprint, retries=1)
+        markers = {name: marker for name, marker in results.items() if marker is not None}
+        unusable = sorted(set(results) - set(markers))
+        if unusable:
+            self.logger.warning(f"Fingerprint output is empty or an error on {len(unusable)} hosts: {', '.join(unusable)}. Collecting in full.")
+
+        fingerprints = {
+            str(targets[name].pk): fingerprint(marker, updated.get(str(targets[name].pk)))
+            for name, marker in markers.items()
+        }
+        unchanged = store.unchanged(fingerprints)
+        skipped = {name for name in markers if str(targets[name].pk) in unchanged}
+        self.logger.info(
+            f"Incremental run: skipping {len(skipped)} unchanged devices, "
+            f"collecting {len(nr.inventory.hosts) - len(skipped)} ({len(errors) + len(unusable)} could not be fingerprinted)."
+        )
+        return nr.filter(filter_func=lambda host: host.name not in skipped), markers
+
+    def collect_with_nornir(self, hosts, groups, defaults, targets, store, workers, incremental):
+        """Collect on a threaded Nornir runner; returns (outputs, errors, fingerprint outputs)."""
         try:
-            data = json.loads(output)
-            interfaces = {}
-            for intf in data.get('TABLE_interface', {}).get('ROW_interface', []):
-                intf_name = intf.get('interface')
-                description = intf.get('desc', '')
-                interfaces[intf_name] = {'description': description}
-            return interfaces
-        except json.JSONDecodeError:
-            self.logger.error("Failed to parse NX-OS JSON output.")
-            return {}
-
-    def parse_junos_interfaces(self, output):
-        """Parse Juniper Junos interface descriptions from show interfaces | display xml."""
+            nr = Nornir(
+                inventory=Inventory(hosts=hosts, groups=groups, defaults=defaults),
+                runner=ThreadedRunner(num_workers=workers),
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to initialize Nornir: {str(e)}")
+            raise JobException(f"Nornir initialization failed: {str(e)}")
+
+        # One parallel pass over all hosts; each gets its platform's command once
+        platforms = {slug: len(nr.filter(platform=slug).inventory.hosts) for slug in groups}
+        self.logger.info(f"Collecting interface descriptions from {len(hosts)} devices ({platforms}) with {workers} parallel sessions.")
+        markers = {}
         try:
-            data = xmltodict.parse(output)
-            interfaces = {}
-            intf_list = data.get('interface-information', {}).get('physical-interface', [])
-            if not isinstance(intf_list, list):
-                intf_list = [intf_list]
-            for intf in intf_list:
-                intf_name = intf.get('name')
-                description = intf.get('description', '')
-                interfaces[intf_name] = {'description': description}
-            return interfaces
-        except xmltodict.ParsingInterrupted:
-            self.logger.error("Failed to parse Junos XML output.")
-            return {}
-
-    def run(self, devices):
+            collect_nr = nr
+            if incremental:
+                # Same connections are reused by the full collection below
+                collect_nr, markers = self.skip_unchanged(nr, targets, store)
+            outputs, errors = self.collect_with_retry(collect_nr)
+        finally:
+            nr.close_connections(on_failed=True)
+        return outputs, errors, markers
+
+    def collect_with_asyncio(self, targets, store, max_sessions, timeout):
+        """
+        Collect over scrapli asyncio sessions on a single event loop; returns (outputs, errors, fingerprint outputs).
+
+        Sessions are capped at `max_sessions` overall and one per device, so
+        the run scales with network latency rather than worker threads.
+        """
+        self.logger.info(f"Collecting interface descriptions from {len(targets)} devices with up to {max_sessions} concurrent sessions (asyncio).")
+        platforms = {name: device.platform.slug for name, device in targets.items()}
+        try:
+            outputs, errors, markers, skipped = collect_interface_outputs(
+                targets, platforms, settings.NAPALM_USERNAME, settings.NAPALM_PASSWORD,
+                store=store, max_sessions=max_sessions, timeout=timeout,
+            )
+        except RuntimeError as e:
+            raise JobException(str(e))
+        if store:
+            self.logger.info(f"Incremental run: skipped {len(skipped)} unchanged devices, collected {len(outputs)}.")
+        return outputs, errors, markers
+
+    def run(self, devices, workers=20, backend="threads", max_sessions=500, timeout=60, incremental=False,
+            log_mode="detailed", shard_size=0, shard_timeout=3600):
+        if shard_size and len(devices) > shard_size:
+            # Parent of a sharded run: fan out to child jobs and aggregate their results
+            return run_sharded(
+                self, devices, shard_size, shard_timeout, workers=workers, backend=backend,
+                max_sessions=max_sessions, timeout=timeout, incremental=incremental, log_mode=log_mode,
+            )
+
         active_status = Status.objects.get(name="Active")
-        
-        # Initialize Nornir inventory from Nautobot devices
-        inventory = {
-            "hosts": {},
-            "groups": {},
-            "defaults": {
-                "username": settings.NAPALM_USERNAME,
-                "password": settings.NAPALM_PASSWORD,
-            }
-        }
-        
+        store = FingerprintStore(f"{__name__}.{type(self).__name__}")
+        # Build the Nornir inventory from Nautobot devices, one group per platform
+        defaults = Defaults(username=settings.NAPALM_USERNAME, password=settings.NAPALM_PASSWORD)
+        hosts = Hosts()
+        groups = Groups()
+        targets = {}
         for device in devices:
             if not device.primary_ip:
                 self.logger.warning(f"Device {device.name} has no primary IP. Skipping.")
@@ -123,79 +243,73 @@ class CopyInterfaceDescriptions(Job):
                 continue
 
             platform_slug = device.platform.slug
-            inventory["hosts"][device.name] = {
-                "hostname": str(device.primary_ip.address.ip),
-                "platform": platform_slug,
-                "groups": [platform_slug],
-            }
-            inventory["groups"][platform_slug] = {
-                "platform": platform_slug,
-                "connection_options": {
-                    "netmiko": {
-                        "platform": platform_slug,
-                        "extras": {"device_type": platform_slug},
-                    }
-                }
-            }
+            if platform_slug not in PARSERS or platform_slug not in NETMIKO_DEVICE_TYPES:
+                self.logger.warning(f"Unsupported platform {platform_slug} for {device.name}. Skipping.")
+                continue
 
-        try:
-            nr = InitNornir(config_data={"inventory": {"options": inventory}})
-        except Exception as e:
-            self.logger.error(f"Failed to initialize Nornir: {str(e)}")
-            raise JobException(f"Nornir initialization failed: {str(e)}")
+            if platform_slug not in groups:
+                groups[platform_slug] = Group(
+                    name=platform_slug,
+                    platform=platform_slug,
+                    connection_options={"netmiko": ConnectionOptions(platform=NETMIKO_DEVICE_TYPES[platform_slug])},
+                    defaults=defaults,
+                )
+            hosts[device.name] = Host(
+                name=device.name,
+                hostname=str(device.primary_ip.address.ip),
+                platform=platform_slug,
+                groups=[groups[platform_slug]],
+                defaults=defaults,
+            )
+            targets[device.name] = device
 
-        for device in devices:
-            if device.name not in nr.inventory.hosts:
-                continue
+        if backend == "asyncio":
+            outputs, errors, markers = self.collect_with_asyncio(targets, store if incremental else None, max_sessions, timeout)
+        else:
+            outputs, errors, markers = self.collect_with_nornir(hosts, groups, defaults, targets, store, workers, incremental)
 
-            host = nr.inventory.hosts[device.name]
-            platform_slug = device.platform.slug
+        log = JobLog(self.logger, summarize=log_mode == "summary")
+        failed = []
+        for device_name, error in sorted(errors.items()):
+            log.error(f"Error processing device {device_name}: {str(error)}", targets[device_name])
+            failed.append(device_name)
 
+        # Apply results to the ORM from the job thread
+        succeeded = []
+        for device_name, output in outputs.items():
+            device = targets[device_name]
+            platform_slug = device.platform.slug
             try:
-                # Test connection with retries
-                if not self.connect_with_retry(nr, device.name):
-                    self.logger.error(f"Failed to connect to {device.name} after retries.")
-                    continue
-
-                # Fetch interface descriptions based on platform
-                if platform_slug == 'ios':
-                    command = "show interfaces"
-                    result = nr.run(task=netmiko_send_command, command_string=command)
-                    interfaces = self.parse_ios_interfaces(result[device.name][0].result)
-                elif platform_slug == 'nxos':
-                    command = "show interface | json"
-                    result = nr.run(task=netmiko_send_command, command_string=command)
-                    interfaces = self.parse_nxos_interfaces(result[device.name][0].result)
-                elif platform_slug == 'junos':
-                    command = "show interfaces | display xml"
-                    result = nr.run(task=netmiko_send_command, command_string=command)
-                    interfaces = self.parse_junos_interfaces(result[device.name][0].result)
-                else:
-                    self.logger.warning(f"Unsupported platform {platform_slug} for {device.name}. Skipping.")
-                    continue
-
-                self.logger.info(f"Fetched interface details for {device.name}: {len(interfaces)} interfaces found.")
-
-                # Update Nautobot interfaces
-                for intf_name, intf_details in interfaces.items():
-                    normalized_intf_name = self.normalize_interface_name(intf_name, platform_slug)
-                    try:
-                        iface = Interface.objects.get(device=device, name=normalized_intf_name)
-                    except Interface.DoesNotExist:
-                        self.logger.warning(f"Interface {normalized_intf_name} not found on device {device.name}. Skipping.")
-                        continue
-
-                    description = intf_details.get('description', '')
-                    iface.description = description
-                    iface.status = active_status
-                    iface.validated_save()
-                    self.logger.info(f"Copied description for {device.name} interface {normalized_intf_name}: {description}")
+                # Streamed (name, description) pairs; a malformed output raises ValueError
+                _, parser = get_parser(platform_slug)
+                descriptions = dict(parser(output))
+                log.info(f"Fetched interface details for {device.name}: {len(descriptions)} interfaces found.", device)
 
+                # Device names (e.g. "Gi1/0/1") are matched to Nautobot's by canonical form
+                counts = sync_interface_descriptions(device, descriptions, active_status, log.device(device), platform_slug)
+                log.summary(device, counts)
+                succeeded.append(device)
             except Exception as e:
-                self.logger.error(f"Error processing device {device.name}: {str(e)}")
-                raise JobException(f"Failed to update for {device.name}: {str(e)}")
-            finally:
-                nr.close_connections()
+                log.error(f"Error processing device {device.name}: {str(e)}", device)
+                failed.append(device.name)
+
+        if incremental:
+            # Fingerprint against the interfaces as this run left them
+            fingerprinted = [device for device in succeeded if device.name in markers]
+            updated = interfaces_last_updated(device.pk for device in fingerprinted)
+            store.save({
+                str(device.pk): fingerprint(markers[device.name], updated.get(str(device.pk)))
+                for device in fingerprinted
+            })
+
+        log.save(self, "interface-descriptions-log.json")
+
+        if failed:
+            # Reported once every other device has been processed
+            raise JobException(f"Failed to update {len(failed)} of {len(hosts)} devices: {', '.join(sorted(failed))}")
+
+        # Returned as the job result; sharded parents aggregate these per shard
+        return {"devices": len(hosts), "collected": len(outputs)}
 
 # Register the job
 register_jobs(CopyInterfaceDescriptions)
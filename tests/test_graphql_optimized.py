@@ -0,0 +1,45 @@
+"""run_query against a local aiohttp server returning GraphQL error bodies."""
+
+import asyncio
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import nautobot_graphql_optimized as optimized
+
+ERROR_BODY = {"data": None, "errors": [{"message": "Cannot query field 'nope' on type 'DeviceType'."}]}
+
+
+def run_query_against(body, monkeypatch, compact):
+    monkeypatch.setattr(optimized, "COMPACT_RECORDS", compact)
+    monkeypatch.setattr(optimized, "metrics", optimized.QueryMetrics())
+
+    async def graphql(request):
+        return web.json_response(body)
+
+    async def main():
+        app = web.Application()
+        app.router.add_post("/graphql/", graphql)
+        async with TestServer(app) as server:
+            monkeypatch.setattr(optimized, "NAUTOBOT_URL", str(server.make_url("")).rstrip("/"))
+            async with aiohttp.ClientSession() as session:
+                return await optimized.run_query(session, optimized.QUERY, {"device_names": ["r1"]}, "1 devices")
+
+    return asyncio.run(main())
+
+
+def test_error_body_fails_with_compact_records(monkeypatch, caplog):
+    assert run_query_against(ERROR_BODY, monkeypatch, compact=True) is None
+    assert optimized.metrics.counters["failures"] == 1
+    assert "Cannot query field" in caplog.text
+
+
+def test_error_body_fails_without_compact_records(monkeypatch):
+    assert run_query_against(ERROR_BODY, monkeypatch, compact=False) is None
+    assert optimized.metrics.counters["failures"] == 1
+
+
+def test_empty_devices_is_not_a_failure_with_compact_records(monkeypatch):
+    assert run_query_against({"data": {"devices": []}}, monkeypatch, compact=True) == []
+    assert optimized.metrics.counters["failures"] == 0
@@ -1,13 +1,20 @@
 """Nautobot Job to copy interface descriptions from devices to Nautobot using LLDP neighbor information."""
 
-from nautobot.apps.jobs import Job, MultiObjectVar, register_jobs
-from nautobot.dcim.models import Device, Interface
+from nautobot.apps.jobs import Job, MultiObjectVar, IntegerVar, BooleanVar, ChoiceVar, register_jobs
+from nautobot.dcim.models import Device
 from nautobot.core.celery import register_jobs as celery_register_jobs
 from nautobot.extras.models import Status
 from napalm import get_network_driver
 from nautobot.utilities.exceptions import JobException
 from django.conf import settings
 
+from nautobot_async_collect import BACKEND_CHOICES, collect_interface_outputs
+from nautobot_fingerprints import FingerprintStore, fingerprint, fingerprint_commands, fingerprint_marker, interfaces_last_updated
+from nautobot_interface_parsers import NAPALM_DRIVER_PLATFORMS, get_parser
+from nautobot_interface_sync import sync_interface_descriptions
+from nautobot_job_logging import LOG_MODE_CHOICES, JobLog
+from nautobot_job_sharding import run_sharded
+
 name = "Interface Description Copier"
 
 class CopyInterfaceDescriptions(Job):
@@ -21,14 +28,73 @@ class CopyInterfaceDescriptions(Job):
         label="Devices",
         description="Select devices to copy interface descriptions from."
     )
+    backend = ChoiceVar(
+        choices=BACKEND_CHOICES,
+        default="threads",
+        label="Collection backend",
+        description="Threads collect one device at a time with NAPALM; asyncio runs every session concurrently on a single event loop."
+    )
+    max_sessions = IntegerVar(
+        default=500,
+        min_value=1,
+        max_value=5000,
+        label="Concurrent sessions (asyncio)",
+        description="Maximum SSH sessions open at once with the asyncio backend."
+    )
+    timeout = IntegerVar(
+        default=60,
+        min_value=5,
+        label="Device timeout (asyncio)",
+        description="Seconds a device may take to connect and answer its commands with the asyncio backend."
+    )
+    incremental = BooleanVar(
+        default=False,
+        label="Incremental",
+        description="Skip devices whose configuration and Nautobot interfaces are unchanged since the last successful run."
+    )
+    log_mode = ChoiceVar(
+        choices=LOG_MODE_CHOICES,
+        default="detailed",
+        label="Logging",
+        description="Summary logs one entry per device plus warnings and errors, and attaches every event as a JSON file."
+    )
+    shard_size = IntegerVar(
+        default=0,
+        min_value=0,
+        label="Shard size",
+        description="Split the selection into child jobs of this many devices, run in parallel across Celery workers. 0 runs everything in this job."
+    )
+    shard_timeout = IntegerVar(
+        default=3600,
+        min_value=60,
+        label="Shard timeout",
+        description="Seconds to wait for all child jobs of a sharded run; children still running then are revoked."
+    )
 
     class Meta:
         name = "Copy Interface Descriptions from Devices"
         description = "Fetches interface descriptions from devices using NAPALM and copies them to the interface descriptions in Nautobot."
         has_sensitive_variables = False
 
-    def run(self, devices):
+    def run(self, devices, backend="threads", max_sessions=500, timeout=60, incremental=False,
+            log_mode="detailed", shard_size=0, shard_timeout=3600):
+        if shard_size and len(devices) > shard_size:
+            # Parent of a sharded run: fan out to child jobs and aggregate their results
+            return run_sharded(
+                self, devices, shard_size, shard_timeout, backend=backend,
+                max_sessions=max_sessions, timeout=timeout, incremental=incremental, log_mode=log_mode,
+            )
+
         active_status = Status.objects.get(name="Active")
+        store = FingerprintStore(f"{__name__}.{type(self).__name__}")
+        log = JobLog(self.logger, summarize=log_mode == "summary")
+        if backend == "asyncio":
+            return self.copy_with_asyncio(devices, active_status, store if incremental else None, max_sessions, timeout, log)
+
+        # One query for every device's last interface update, used to spot edits made in Nautobot
+        updated = interfaces_last_updated(device.pk for device in devices) if incremental else {}
+        skipped = 0
+
         for device in devices:
             if not device.primary_ip:
                 self.logger.warning(f"Device {device.name} has no primary IP. Skipping.")
@@ -47,30 +113,129 @@ class CopyInterfaceDescriptions(Job):
 
             try:
                 napalm_device.open()
-                interfaces = napalm_device.get_interfaces()
-                self.logger.info(f"Fetched interface details for {device.name}: {len(interfaces)} interfaces found.")
 
-                for intf_name, intf_details in interfaces.items():
-                    # Find the interface in Nautobot
+                # Cheap config-change check before pulling every interface
+                driver = device.platform.napalm_driver
+                commands = fingerprint_commands(driver) if incremental else []
+                marker = None
+                if commands:
+                    # A failed check only costs the shortcut; the full collection still runs
                     try:
-                        iface = Interface.objects.get(device=device, name=intf_name)
-                    except Interface.DoesNotExist:
-                        self.logger.warning(f"Interface {intf_name} not found on device {device.name}. Skipping.")
+                        cli = napalm_device.cli(commands)
+                    except Exception as e:
+                        log.warning(f"Fingerprint check failed on {device.name}: {str(e)}. Collecting in full.", device)
+                    else:
+                        marker = fingerprint_marker(driver, [cli[command] for command in commands])
+                        if marker is None:
+                            log.warning(f"Fingerprint output from {device.name} is empty or an error. Collecting in full.", device)
+                    if marker is not None and store.unchanged({str(device.pk): fingerprint(marker, updated.get(str(device.pk)))}):
+                        log.info(f"{device.name} is unchanged since the last run. Skipping.", device)
+                        skipped += 1
                         continue
 
-                    # Copy the interface description from the device
-                    description = intf_details.get('description', '')
-                    iface.description = description
-                    iface.status = active_status
-                    iface.validated_save()
-                    self.logger.info(f"Copied description for {device.name} interface {intf_name}: {description}")
+                interfaces = napalm_device.get_interfaces()
+                log.info(f"Fetched interface details for {device.name}: {len(interfaces)} interfaces found.", device)
+
+                # Copy the interface descriptions from the device, writing only the ones that changed
+                descriptions = {
+                    intf_name: intf_details.get('description', '')
+                    for intf_name, intf_details in interfaces.items()
+                }
+                counts = sync_interface_descriptions(
+                    device, descriptions, active_status, log.device(device), device.platform.napalm_driver
+                )
+                log.summary(device, counts)
+
+                if marker is not None:
+                    # Fingerprint against the interfaces as this run left them
+                    after = interfaces_last_updated([device.pk]).get(str(device.pk))
+                    store.save({str(device.pk): fingerprint(marker, after)})
 
             except Exception as e:
-                self.logger.error(f"Error processing device {device.name}: {str(e)}")
+                log.error(f"Error processing device {device.name}: {str(e)}", device)
+                log.save(self, "interface-descriptions-log.json")
                 raise JobException(f"Failed to update for {device.name}: {str(e)}")
             finally:
                 napalm_device.close()
 
+        if incremental:
+            self.logger.info(f"Incremental run: skipped {skipped} unchanged devices.")
+        log.save(self, "interface-descriptions-log.json")
+
+        # Returned as the job result; sharded parents aggregate these per shard
+        return {"devices": len(devices), "skipped": skipped}
+
+    def copy_with_asyncio(self, devices, active_status, store, max_sessions, timeout, log):
+        """
+        Collect every device concurrently over scrapli asyncio sessions, then apply the results in this thread.
+
+        The NAPALM driver picks the CLI command and parser, so the same
+        descriptions reach the same sync step as the NAPALM path.
+        """
+        targets = {}
+        platforms = {}
+        for device in devices:
+            if not device.primary_ip:
+                self.logger.warning(f"Device {device.name} has no primary IP. Skipping.")
+                continue
+            if not device.platform or not device.platform.napalm_driver:
+                self.logger.warning(f"Device {device.name} has no NAPALM driver configured. Skipping.")
+                continue
+            platform_slug = NAPALM_DRIVER_PLATFORMS.get(device.platform.napalm_driver)
+            if platform_slug is None:
+                self.logger.warning(f"NAPALM driver {device.platform.napalm_driver} for {device.name} has no asyncio parser. Skipping.")
+                continue
+            targets[device.name] = device
+            platforms[device.name] = platform_slug
+
+        self.logger.info(f"Collecting interface descriptions from {len(targets)} devices with up to {max_sessions} concurrent sessions (asyncio).")
+        try:
+            outputs, errors, markers, skipped = collect_interface_outputs(
+                targets, platforms, settings.NAPALM_USERNAME, settings.NAPALM_PASSWORD,
+                store=store, max_sessions=max_sessions, timeout=timeout,
+            )
+        except RuntimeError as e:
+            raise JobException(str(e))
+
+        failed = []
+        for device_name, error in sorted(errors.items()):
+            log.error(f"Error processing device {device_name}: {str(error)}", targets[device_name])
+            failed.append(device_name)
+
+        succeeded = []
+        for device_name, output in outputs.items():
+            device = targets[device_name]
+            try:
+                _, parser = get_parser(platforms[device_name])
+                descriptions = dict(parser(output))
+                log.info(f"Fetched interface details for {device.name}: {len(descriptions)} interfaces found.", device)
+                counts = sync_interface_descriptions(
+                    device, descriptions, active_status, log.device(device), device.platform.napalm_driver
+                )
+                log.summary(device, counts)
+                succeeded.append(device)
+            except Exception as e:
+                log.error(f"Error processing device {device.name}: {str(e)}", device)
+                failed.append(device.name)
+
+        if store:
+            self.logger.info(f"Incremental run: skipped {len(skipped)} unchanged devices.")
+            # Fingerprint against the interfaces as this run left them
+            fingerprinted = [device for device in succeeded if device.name in markers]
+            updated = interfaces_last_updated(device.pk for device in fingerprinted)
+            store.save({
+                str(device.pk): fingerprint(markers[device.name], updated.get(str(device.pk)))
+                for device in fingerprinted
+            })
+
+        log.save(self, "interface-descriptions-log.json")
+
+        if failed:
+            raise JobException(f"Failed to update {len(failed)} of {len(targets)} devices: {', '.join(sorted(failed))}")
+
+        # Same result shape as the NAPALM path
+        return {"devices": len(devices), "skipped": len(skipped)}
+
 # Register the job
 register_jobs(CopyInterfaceDescriptions)
 celery_register_jobs(CopyInterfaceDescriptions)